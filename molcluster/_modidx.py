@@ -6,6 +6,127 @@ d = { 'settings': { 'branch': 'master',
                 'git_url': 'https://github.com/marcossantanaioc/molcluster',
                 'lib_path': 'molcluster'},
   'syms': { 'molcluster.chem_basics': {},
+            'molcluster.data': { 'molcluster.data.as_array': ('data.html#as_array', 'molcluster/data.py'),
+                                 'molcluster.data.is_chunked': ('data.html#is_chunked', 'molcluster/data.py'),
+                                 'molcluster.data.iter_chunks': ('data.html#iter_chunks', 'molcluster/data.py'),
+                                 'molcluster.data.load_array': ('data.html#load_array', 'molcluster/data.py'),
+                                 'molcluster.data.n_chunks': ('data.html#n_chunks', 'molcluster/data.py')},
+            'molcluster.fingerprints': { 'molcluster.fingerprints.FingerprintMatrix': ( 'fingerprints.html#fingerprintmatrix',
+                                                                                        'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints.FingerprintMatrix.__array__': ( 'fingerprints.html#__array__',
+                                                                                                  'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints.FingerprintMatrix.__getitem__': ( 'fingerprints.html#__getitem__',
+                                                                                                    'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints.FingerprintMatrix.__init__': ( 'fingerprints.html#__init__',
+                                                                                                 'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints.FingerprintMatrix.__len__': ( 'fingerprints.html#__len__',
+                                                                                                'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints.FingerprintMatrix.__repr__': ( 'fingerprints.html#__repr__',
+                                                                                                 'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints.FingerprintMatrix.from_array': ( 'fingerprints.html#from_array',
+                                                                                                   'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints.FingerprintMatrix.from_fps': ( 'fingerprints.html#from_fps',
+                                                                                                 'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints.FingerprintMatrix.iter_dense': ( 'fingerprints.html#iter_dense',
+                                                                                                   'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints.FingerprintMatrix.load': ( 'fingerprints.html#load',
+                                                                                             'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints.FingerprintMatrix.nbytes': ( 'fingerprints.html#nbytes',
+                                                                                               'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints.FingerprintMatrix.save': ( 'fingerprints.html#save',
+                                                                                             'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints.FingerprintMatrix.shape': ( 'fingerprints.html#shape',
+                                                                                              'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints.FingerprintMatrix.to_csr': ( 'fingerprints.html#to_csr',
+                                                                                               'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints.FingerprintMatrix.to_dense': ( 'fingerprints.html#to_dense',
+                                                                                                 'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints.FingerprintMatrix.to_fps': ( 'fingerprints.html#to_fps',
+                                                                                               'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints.FingerprintStore': ( 'fingerprints.html#fingerprintstore',
+                                                                                       'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints.FingerprintStore.__enter__': ( 'fingerprints.html#__enter__',
+                                                                                                 'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints.FingerprintStore.__exit__': ( 'fingerprints.html#__exit__',
+                                                                                                'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints.FingerprintStore.__init__': ( 'fingerprints.html#__init__',
+                                                                                                'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints.FingerprintStore._table': ( 'fingerprints.html#_table',
+                                                                                              'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints.FingerprintStore.flush': ( 'fingerprints.html#flush',
+                                                                                             'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints.FingerprintStore.get_fps': ( 'fingerprints.html#get_fps',
+                                                                                               'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints.FingerprintStore.hit_rate': ( 'fingerprints.html#hit_rate',
+                                                                                                'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints.FingerprintStore.num_bits': ( 'fingerprints.html#num_bits',
+                                                                                                'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints._NpyWriter': ( 'fingerprints.html#_npywriter',
+                                                                                 'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints._NpyWriter.__init__': ( 'fingerprints.html#__init__',
+                                                                                          'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints._NpyWriter.close': ( 'fingerprints.html#close',
+                                                                                       'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints._NpyWriter.write': ( 'fingerprints.html#write',
+                                                                                       'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints._StoreTable': ( 'fingerprints.html#_storetable',
+                                                                                  'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints._StoreTable.__init__': ( 'fingerprints.html#__init__',
+                                                                                           'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints._StoreTable._open_bits': ( 'fingerprints.html#_open_bits',
+                                                                                             'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints._StoreTable.add': ( 'fingerprints.html#add',
+                                                                                      'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints._StoreTable.alias': ( 'fingerprints.html#alias',
+                                                                                        'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints._StoreTable.flush': ( 'fingerprints.html#flush',
+                                                                                        'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints._StoreTable.lookup': ( 'fingerprints.html#lookup',
+                                                                                         'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints._atom_pair_fp': ( 'fingerprints.html#_atom_pair_fp',
+                                                                                    'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints._check_bit_vector': ( 'fingerprints.html#_check_bit_vector',
+                                                                                        'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints._chunked': ('fingerprints.html#_chunked', 'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints._descriptor': ( 'fingerprints.html#_descriptor',
+                                                                                  'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints._effective_n_jobs': ( 'fingerprints.html#_effective_n_jobs',
+                                                                                        'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints._maccs_fp': ('fingerprints.html#_maccs_fp', 'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints._map_chunks': ( 'fingerprints.html#_map_chunks',
+                                                                                  'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints._morgan_fp': ( 'fingerprints.html#_morgan_fp',
+                                                                                 'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints._pad_bytes': ( 'fingerprints.html#_pad_bytes',
+                                                                                 'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints._rdkit_fp': ('fingerprints.html#_rdkit_fp', 'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints._smiles_chunk_to_features': ( 'fingerprints.html#_smiles_chunk_to_features',
+                                                                                                'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints._smiles_chunk_to_fps': ( 'fingerprints.html#_smiles_chunk_to_fps',
+                                                                                           'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints._smiles_column': ( 'fingerprints.html#_smiles_column',
+                                                                                     'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints.available_fingerprints': ( 'fingerprints.html#available_fingerprints',
+                                                                                             'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints.featurize': ('fingerprints.html#featurize', 'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints.get_fingerprint_function': ( 'fingerprints.html#get_fingerprint_function',
+                                                                                               'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints.pack_array': ( 'fingerprints.html#pack_array',
+                                                                                 'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints.pack_fingerprints': ( 'fingerprints.html#pack_fingerprints',
+                                                                                        'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints.popcount': ('fingerprints.html#popcount', 'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints.register_fingerprint': ( 'fingerprints.html#register_fingerprint',
+                                                                                           'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints.smiles_to_fps': ( 'fingerprints.html#smiles_to_fps',
+                                                                                    'molcluster/fingerprints.py'),
+                                         'molcluster.fingerprints.unpack_fingerprints': ( 'fingerprints.html#unpack_fingerprints',
+                                                                                          'molcluster/fingerprints.py')},
+            'molcluster.persistence': { 'molcluster.persistence._is_json': ('persistence.html#_is_json', 'molcluster/persistence.py'),
+                                        'molcluster.persistence._is_numeric_list': ( 'persistence.html#_is_numeric_list',
+                                                                                     'molcluster/persistence.py'),
+                                        'molcluster.persistence.load_model': ('persistence.html#load_model', 'molcluster/persistence.py'),
+                                        'molcluster.persistence.save_model': ('persistence.html#save_model', 'molcluster/persistence.py')},
             'molcluster.typing_basics': {},
             'molcluster.unsupervised_learning.clustering': { 'molcluster.unsupervised_learning.clustering.BaseClustering': ( 'clustering.html#baseclustering',
                                                                                                                              'molcluster/unsupervised_learning/clustering.py'),
@@ -15,24 +136,58 @@ d = { 'settings': { 'branch': 'master',
                                                                                                                                      'molcluster/unsupervised_learning/clustering.py'),
                                                              'molcluster.unsupervised_learning.clustering.BaseClustering.clusterer': ( 'clustering.html#clusterer',
                                                                                                                                        'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering.BaseClustering.from_smiles': ( 'clustering.html#from_smiles',
+                                                                                                                                         'molcluster/unsupervised_learning/clustering.py'),
                                                              'molcluster.unsupervised_learning.clustering.BaseClustering.labels': ( 'clustering.html#labels',
                                                                                                                                     'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering.BaseClustering.load': ( 'clustering.html#load',
+                                                                                                                                  'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering.BaseClustering.save': ( 'clustering.html#save',
+                                                                                                                                  'molcluster/unsupervised_learning/clustering.py'),
                                                              'molcluster.unsupervised_learning.clustering.ButinaClustering': ( 'clustering.html#butinaclustering',
                                                                                                                                'molcluster/unsupervised_learning/clustering.py'),
                                                              'molcluster.unsupervised_learning.clustering.ButinaClustering.__init__': ( 'clustering.html#__init__',
                                                                                                                                         'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering.ButinaClustering._cluster_graph': ( 'clustering.html#_cluster_graph',
+                                                                                                                                              'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering.ButinaClustering._dataset_graph': ( 'clustering.html#_dataset_graph',
+                                                                                                                                              'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering.ButinaClustering._fp_params': ( 'clustering.html#_fp_params',
+                                                                                                                                          'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering.ButinaClustering._fps_graph': ( 'clustering.html#_fps_graph',
+                                                                                                                                          'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering.ButinaClustering._insert_invalid': ( 'clustering.html#_insert_invalid',
+                                                                                                                                               'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering.ButinaClustering._packed_graph': ( 'clustering.html#_packed_graph',
+                                                                                                                                             'molcluster/unsupervised_learning/clustering.py'),
                                                              'molcluster.unsupervised_learning.clustering.ButinaClustering.cluster': ( 'clustering.html#cluster',
                                                                                                                                        'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering.ButinaClustering.cluster_fps': ( 'clustering.html#cluster_fps',
+                                                                                                                                           'molcluster/unsupervised_learning/clustering.py'),
                                                              'molcluster.unsupervised_learning.clustering.ButinaClustering.cluster_mols': ( 'clustering.html#cluster_mols',
                                                                                                                                             'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering.ButinaClustering.cluster_sweep': ( 'clustering.html#cluster_sweep',
+                                                                                                                                             'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering.ButinaClustering.from_smiles': ( 'clustering.html#from_smiles',
+                                                                                                                                           'molcluster/unsupervised_learning/clustering.py'),
                                                              'molcluster.unsupervised_learning.clustering.ButinaClustering.get_fps': ( 'clustering.html#get_fps',
                                                                                                                                        'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering.ButinaClustering.predict': ( 'clustering.html#predict',
+                                                                                                                                       'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering.ButinaClustering.predict_fps': ( 'clustering.html#predict_fps',
+                                                                                                                                           'molcluster/unsupervised_learning/clustering.py'),
                                                              'molcluster.unsupervised_learning.clustering.HDBSCANClustering': ( 'clustering.html#hdbscanclustering',
                                                                                                                                 'molcluster/unsupervised_learning/clustering.py'),
                                                              'molcluster.unsupervised_learning.clustering.HDBSCANClustering.__init__': ( 'clustering.html#__init__',
                                                                                                                                          'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering.HDBSCANClustering._generate_prediction_data': ( 'clustering.html#_generate_prediction_data',
+                                                                                                                                                          'molcluster/unsupervised_learning/clustering.py'),
                                                              'molcluster.unsupervised_learning.clustering.HDBSCANClustering.cluster': ( 'clustering.html#cluster',
                                                                                                                                         'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering.HDBSCANClustering.predict': ( 'clustering.html#predict',
+                                                                                                                                        'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering.HDBSCANClustering.save': ( 'clustering.html#save',
+                                                                                                                                     'molcluster/unsupervised_learning/clustering.py'),
                                                              'molcluster.unsupervised_learning.clustering.HDBSCANClustering.validate_clustering': ( 'clustering.html#validate_clustering',
                                                                                                                                                     'molcluster/unsupervised_learning/clustering.py'),
                                                              'molcluster.unsupervised_learning.clustering.HierarchicalClustering': ( 'clustering.html#hierarchicalclustering',
@@ -41,6 +196,12 @@ d = { 'settings': { 'branch': 'master',
                                                                                                                                               'molcluster/unsupervised_learning/clustering.py'),
                                                              'molcluster.unsupervised_learning.clustering.HierarchicalClustering.cluster': ( 'clustering.html#cluster',
                                                                                                                                              'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering.HierarchicalClustering.cut': ( 'clustering.html#cut',
+                                                                                                                                         'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering.HierarchicalClustering.fit_tree': ( 'clustering.html#fit_tree',
+                                                                                                                                              'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering.HierarchicalClustering.linkage_matrix': ( 'clustering.html#linkage_matrix',
+                                                                                                                                                    'molcluster/unsupervised_learning/clustering.py'),
                                                              'molcluster.unsupervised_learning.clustering.HierarchicalClustering.plot_dendrogram': ( 'clustering.html#plot_dendrogram',
                                                                                                                                                      'molcluster/unsupervised_learning/clustering.py'),
                                                              'molcluster.unsupervised_learning.clustering.KMeansClustering': ( 'clustering.html#kmeansclustering',
@@ -49,14 +210,192 @@ d = { 'settings': { 'branch': 'master',
                                                                                                                                         'molcluster/unsupervised_learning/clustering.py'),
                                                              'molcluster.unsupervised_learning.clustering.KMeansClustering.cluster': ( 'clustering.html#cluster',
                                                                                                                                        'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering.KMeansClustering.cluster_streaming': ( 'clustering.html#cluster_streaming',
+                                                                                                                                                 'molcluster/unsupervised_learning/clustering.py'),
                                                              'molcluster.unsupervised_learning.clustering.KMeansClustering.elbow_method': ( 'clustering.html#elbow_method',
-                                                                                                                                            'molcluster/unsupervised_learning/clustering.py')},
+                                                                                                                                            'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering.KMeansClustering.inertia_sweep': ( 'clustering.html#inertia_sweep',
+                                                                                                                                             'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering.KMeansClustering.plot_elbow': ( 'clustering.html#plot_elbow',
+                                                                                                                                          'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering.KMeansClustering.predict': ( 'clustering.html#predict',
+                                                                                                                                       'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering.LeaderClustering': ( 'clustering.html#leaderclustering',
+                                                                                                                               'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering.LeaderClustering.__init__': ( 'clustering.html#__init__',
+                                                                                                                                        'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering.LeaderClustering._chunk_fps': ( 'clustering.html#_chunk_fps',
+                                                                                                                                          'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering.LeaderClustering.cluster': ( 'clustering.html#cluster',
+                                                                                                                                       'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering._Leaders': ( 'clustering.html#_leaders',
+                                                                                                                       'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering._Leaders.__init__': ( 'clustering.html#__init__',
+                                                                                                                                'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering._Leaders._append': ( 'clustering.html#_append',
+                                                                                                                               'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering._Leaders.assign': ( 'clustering.html#assign',
+                                                                                                                              'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering._Leaders.nearest': ( 'clustering.html#nearest',
+                                                                                                                               'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering._PackedTanimotoTree': ( 'clustering.html#_packedtanimototree',
+                                                                                                                                  'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering._PackedTanimotoTree.__init__': ( 'clustering.html#__init__',
+                                                                                                                                           'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering._PackedTanimotoTree.query': ( 'clustering.html#query',
+                                                                                                                                        'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering._TanimotoPredictionData': ( 'clustering.html#_tanimotopredictiondata',
+                                                                                                                                      'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering._TanimotoPredictionData.__init__': ( 'clustering.html#__init__',
+                                                                                                                                               'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering._TanimotoPredictionData._clusters_below': ( 'clustering.html#_clusters_below',
+                                                                                                                                                      'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering._block_distances': ( 'clustering.html#_block_distances',
+                                                                                                                               'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering._connect_components': ( 'clustering.html#_connect_components',
+                                                                                                                                  'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering._find_elbow': ( 'clustering.html#_find_elbow',
+                                                                                                                          'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering._graph_linkage': ( 'clustering.html#_graph_linkage',
+                                                                                                                             'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering._init_kmeans_worker': ( 'clustering.html#_init_kmeans_worker',
+                                                                                                                                  'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering._kmeans_sweep_segment': ( 'clustering.html#_kmeans_sweep_segment',
+                                                                                                                                    'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering._kmeanspp_extend': ( 'clustering.html#_kmeanspp_extend',
+                                                                                                                               'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering._knn_connectivity': ( 'clustering.html#_knn_connectivity',
+                                                                                                                                'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering._knn_edges': ( 'clustering.html#_knn_edges',
+                                                                                                                         'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering._knn_mutual_reachability_mst': ( 'clustering.html#_knn_mutual_reachability_mst',
+                                                                                                                                           'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering._linkage_matrix': ( 'clustering.html#_linkage_matrix',
+                                                                                                                              'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering._sweep_segments': ( 'clustering.html#_sweep_segments',
+                                                                                                                              'molcluster/unsupervised_learning/clustering.py'),
+                                                             'molcluster.unsupervised_learning.clustering._worker_kmeans_sweep_segment': ( 'clustering.html#_worker_kmeans_sweep_segment',
+                                                                                                                                           'molcluster/unsupervised_learning/clustering.py')},
+            'molcluster.unsupervised_learning.sharding': { 'molcluster.unsupervised_learning.sharding.ShardedClustering': ( 'sharding.html#shardedclustering',
+                                                                                                                            'molcluster/unsupervised_learning/sharding.py'),
+                                                           'molcluster.unsupervised_learning.sharding.ShardedClustering.__init__': ( 'sharding.html#__init__',
+                                                                                                                                     'molcluster/unsupervised_learning/sharding.py'),
+                                                           'molcluster.unsupervised_learning.sharding.ShardedClustering._merge': ( 'sharding.html#_merge',
+                                                                                                                                   'molcluster/unsupervised_learning/sharding.py'),
+                                                           'molcluster.unsupervised_learning.sharding.ShardedClustering._shard_keys': ( 'sharding.html#_shard_keys',
+                                                                                                                                        'molcluster/unsupervised_learning/sharding.py'),
+                                                           'molcluster.unsupervised_learning.sharding.ShardedClustering._shard_kwargs': ( 'sharding.html#_shard_kwargs',
+                                                                                                                                          'molcluster/unsupervised_learning/sharding.py'),
+                                                           'molcluster.unsupervised_learning.sharding.ShardedClustering._smiles_dataset': ( 'sharding.html#_smiles_dataset',
+                                                                                                                                            'molcluster/unsupervised_learning/sharding.py'),
+                                                           'molcluster.unsupervised_learning.sharding.ShardedClustering._smiles_fps': ( 'sharding.html#_smiles_fps',
+                                                                                                                                        'molcluster/unsupervised_learning/sharding.py'),
+                                                           'molcluster.unsupervised_learning.sharding.ShardedClustering.cluster': ( 'sharding.html#cluster',
+                                                                                                                                    'molcluster/unsupervised_learning/sharding.py'),
+                                                           'molcluster.unsupervised_learning.sharding.ShardedClustering.from_smiles': ( 'sharding.html#from_smiles',
+                                                                                                                                        'molcluster/unsupervised_learning/sharding.py'),
+                                                           'molcluster.unsupervised_learning.sharding._cluster_shard': ( 'sharding.html#_cluster_shard',
+                                                                                                                         'molcluster/unsupervised_learning/sharding.py'),
+                                                           'molcluster.unsupervised_learning.sharding._init_shard_worker': ( 'sharding.html#_init_shard_worker',
+                                                                                                                             'molcluster/unsupervised_learning/sharding.py'),
+                                                           'molcluster.unsupervised_learning.sharding._map_shards': ( 'sharding.html#_map_shards',
+                                                                                                                      'molcluster/unsupervised_learning/sharding.py'),
+                                                           'molcluster.unsupervised_learning.sharding._medoids': ( 'sharding.html#_medoids',
+                                                                                                                   'molcluster/unsupervised_learning/sharding.py'),
+                                                           'molcluster.unsupervised_learning.sharding._scaffold_chunk': ( 'sharding.html#_scaffold_chunk',
+                                                                                                                          'molcluster/unsupervised_learning/sharding.py'),
+                                                           'molcluster.unsupervised_learning.sharding._take': ( 'sharding.html#_take',
+                                                                                                                'molcluster/unsupervised_learning/sharding.py'),
+                                                           'molcluster.unsupervised_learning.sharding.fingerprint_buckets': ( 'sharding.html#fingerprint_buckets',
+                                                                                                                              'molcluster/unsupervised_learning/sharding.py'),
+                                                           'molcluster.unsupervised_learning.sharding.make_shards': ( 'sharding.html#make_shards',
+                                                                                                                      'molcluster/unsupervised_learning/sharding.py'),
+                                                           'molcluster.unsupervised_learning.sharding.scaffold_keys': ( 'sharding.html#scaffold_keys',
+                                                                                                                        'molcluster/unsupervised_learning/sharding.py')},
+            'molcluster.unsupervised_learning.similarity': { 'molcluster.unsupervised_learning.similarity.MinHashIndex': ( 'similarity.html#minhashindex',
+                                                                                                                           'molcluster/unsupervised_learning/similarity.py'),
+                                                             'molcluster.unsupervised_learning.similarity.MinHashIndex.__init__': ( 'similarity.html#__init__',
+                                                                                                                                    'molcluster/unsupervised_learning/similarity.py'),
+                                                             'molcluster.unsupervised_learning.similarity.MinHashIndex.__len__': ( 'similarity.html#__len__',
+                                                                                                                                   'molcluster/unsupervised_learning/similarity.py'),
+                                                             'molcluster.unsupervised_learning.similarity.MinHashIndex._band_keys': ( 'similarity.html#_band_keys',
+                                                                                                                                      'molcluster/unsupervised_learning/similarity.py'),
+                                                             'molcluster.unsupervised_learning.similarity.MinHashIndex._too_many_candidates': ( 'similarity.html#_too_many_candidates',
+                                                                                                                                                'molcluster/unsupervised_learning/similarity.py'),
+                                                             'molcluster.unsupervised_learning.similarity.MinHashIndex.band_size': ( 'similarity.html#band_size',
+                                                                                                                                     'molcluster/unsupervised_learning/similarity.py'),
+                                                             'molcluster.unsupervised_learning.similarity.MinHashIndex.candidate_pairs': ( 'similarity.html#candidate_pairs',
+                                                                                                                                           'molcluster/unsupervised_learning/similarity.py'),
+                                                             'molcluster.unsupervised_learning.similarity.MinHashIndex.from_fps': ( 'similarity.html#from_fps',
+                                                                                                                                    'molcluster/unsupervised_learning/similarity.py'),
+                                                             'molcluster.unsupervised_learning.similarity.MinHashIndex.n_candidates': ( 'similarity.html#n_candidates',
+                                                                                                                                        'molcluster/unsupervised_learning/similarity.py'),
+                                                             'molcluster.unsupervised_learning.similarity.MinHashIndex.query_knn': ( 'similarity.html#query_knn',
+                                                                                                                                     'molcluster/unsupervised_learning/similarity.py'),
+                                                             'molcluster.unsupervised_learning.similarity.MinHashIndex.query_radius': ( 'similarity.html#query_radius',
+                                                                                                                                        'molcluster/unsupervised_learning/similarity.py'),
+                                                             'molcluster.unsupervised_learning.similarity.NeighbourGraph': ( 'similarity.html#neighbourgraph',
+                                                                                                                             'molcluster/unsupervised_learning/similarity.py'),
+                                                             'molcluster.unsupervised_learning.similarity.NeighbourGraph.__init__': ( 'similarity.html#__init__',
+                                                                                                                                      'molcluster/unsupervised_learning/similarity.py'),
+                                                             'molcluster.unsupervised_learning.similarity.NeighbourGraph.__len__': ( 'similarity.html#__len__',
+                                                                                                                                     'molcluster/unsupervised_learning/similarity.py'),
+                                                             'molcluster.unsupervised_learning.similarity.NeighbourGraph.degree': ( 'similarity.html#degree',
+                                                                                                                                    'molcluster/unsupervised_learning/similarity.py'),
+                                                             'molcluster.unsupervised_learning.similarity.NeighbourGraph.filter': ( 'similarity.html#filter',
+                                                                                                                                    'molcluster/unsupervised_learning/similarity.py'),
+                                                             'molcluster.unsupervised_learning.similarity.NeighbourGraph.from_lower_triangle': ( 'similarity.html#from_lower_triangle',
+                                                                                                                                                 'molcluster/unsupervised_learning/similarity.py'),
+                                                             'molcluster.unsupervised_learning.similarity.NeighbourGraph.neighbours': ( 'similarity.html#neighbours',
+                                                                                                                                        'molcluster/unsupervised_learning/similarity.py'),
+                                                             'molcluster.unsupervised_learning.similarity._bucket_pairs': ( 'similarity.html#_bucket_pairs',
+                                                                                                                            'molcluster/unsupervised_learning/similarity.py'),
+                                                             'molcluster.unsupervised_learning.similarity._init_worker': ( 'similarity.html#_init_worker',
+                                                                                                                           'molcluster/unsupervised_learning/similarity.py'),
+                                                             'molcluster.unsupervised_learning.similarity._neighbour_rows': ( 'similarity.html#_neighbour_rows',
+                                                                                                                              'molcluster/unsupervised_learning/similarity.py'),
+                                                             'molcluster.unsupervised_learning.similarity._packed_knn_rows': ( 'similarity.html#_packed_knn_rows',
+                                                                                                                               'molcluster/unsupervised_learning/similarity.py'),
+                                                             'molcluster.unsupervised_learning.similarity._packed_neighbour_rows': ( 'similarity.html#_packed_neighbour_rows',
+                                                                                                                                     'molcluster/unsupervised_learning/similarity.py'),
+                                                             'molcluster.unsupervised_learning.similarity._pair_tanimoto': ( 'similarity.html#_pair_tanimoto',
+                                                                                                                             'molcluster/unsupervised_learning/similarity.py'),
+                                                             'molcluster.unsupervised_learning.similarity._triangular_blocks': ( 'similarity.html#_triangular_blocks',
+                                                                                                                                 'molcluster/unsupervised_learning/similarity.py'),
+                                                             'molcluster.unsupervised_learning.similarity._worker_neighbour_rows': ( 'similarity.html#_worker_neighbour_rows',
+                                                                                                                                     'molcluster/unsupervised_learning/similarity.py'),
+                                                             'molcluster.unsupervised_learning.similarity.butina_clusters': ( 'similarity.html#butina_clusters',
+                                                                                                                              'molcluster/unsupervised_learning/similarity.py'),
+                                                             'molcluster.unsupervised_learning.similarity.knn_recall': ( 'similarity.html#knn_recall',
+                                                                                                                         'molcluster/unsupervised_learning/similarity.py'),
+                                                             'molcluster.unsupervised_learning.similarity.neighbour_recall': ( 'similarity.html#neighbour_recall',
+                                                                                                                               'molcluster/unsupervised_learning/similarity.py'),
+                                                             'molcluster.unsupervised_learning.similarity.packed_tanimoto_knn': ( 'similarity.html#packed_tanimoto_knn',
+                                                                                                                                  'molcluster/unsupervised_learning/similarity.py'),
+                                                             'molcluster.unsupervised_learning.similarity.packed_tanimoto_neighbours': ( 'similarity.html#packed_tanimoto_neighbours',
+                                                                                                                                         'molcluster/unsupervised_learning/similarity.py'),
+                                                             'molcluster.unsupervised_learning.similarity.tanimoto_block': ( 'similarity.html#tanimoto_block',
+                                                                                                                             'molcluster/unsupervised_learning/similarity.py'),
+                                                             'molcluster.unsupervised_learning.similarity.tanimoto_condensed': ( 'similarity.html#tanimoto_condensed',
+                                                                                                                                 'molcluster/unsupervised_learning/similarity.py'),
+                                                             'molcluster.unsupervised_learning.similarity.tanimoto_distances': ( 'similarity.html#tanimoto_distances',
+                                                                                                                                 'molcluster/unsupervised_learning/similarity.py'),
+                                                             'molcluster.unsupervised_learning.similarity.tanimoto_matrix': ( 'similarity.html#tanimoto_matrix',
+                                                                                                                              'molcluster/unsupervised_learning/similarity.py'),
+                                                             'molcluster.unsupervised_learning.similarity.tanimoto_neighbours': ( 'similarity.html#tanimoto_neighbours',
+                                                                                                                                  'molcluster/unsupervised_learning/similarity.py')},
             'molcluster.unsupervised_learning.transform': { 'molcluster.unsupervised_learning.transform.BaseTransform': ( 'dimensionality_reduction.html#basetransform',
                                                                                                                           'molcluster/unsupervised_learning/transform.py'),
                                                             'molcluster.unsupervised_learning.transform.BaseTransform.__init__': ( 'dimensionality_reduction.html#__init__',
                                                                                                                                    'molcluster/unsupervised_learning/transform.py'),
+                                                            'molcluster.unsupervised_learning.transform.BaseTransform.from_smiles': ( 'dimensionality_reduction.html#from_smiles',
+                                                                                                                                      'molcluster/unsupervised_learning/transform.py'),
+                                                            'molcluster.unsupervised_learning.transform.BaseTransform.load': ( 'dimensionality_reduction.html#load',
+                                                                                                                               'molcluster/unsupervised_learning/transform.py'),
                                                             'molcluster.unsupervised_learning.transform.BaseTransform.reducer': ( 'dimensionality_reduction.html#reducer',
                                                                                                                                   'molcluster/unsupervised_learning/transform.py'),
+                                                            'molcluster.unsupervised_learning.transform.BaseTransform.save': ( 'dimensionality_reduction.html#save',
+                                                                                                                               'molcluster/unsupervised_learning/transform.py'),
                                                             'molcluster.unsupervised_learning.transform.PCATransform': ( 'dimensionality_reduction.html#pcatransform',
                                                                                                                          'molcluster/unsupervised_learning/transform.py'),
                                                             'molcluster.unsupervised_learning.transform.PCATransform.__init__': ( 'dimensionality_reduction.html#__init__',
@@ -68,8 +407,107 @@ d = { 'settings': { 'branch': 'master',
                                                             'molcluster.unsupervised_learning.transform.UMAPTransform.__init__': ( 'dimensionality_reduction.html#__init__',
                                                                                                                                    'molcluster/unsupervised_learning/transform.py'),
                                                             'molcluster.unsupervised_learning.transform.UMAPTransform.reduce': ( 'dimensionality_reduction.html#reduce',
-                                                                                                                                 'molcluster/unsupervised_learning/transform.py')},
+                                                                                                                                 'molcluster/unsupervised_learning/transform.py'),
+                                                            'molcluster.unsupervised_learning.transform.UMAPTransform.reduce_streaming': ( 'dimensionality_reduction.html#reduce_streaming',
+                                                                                                                                           'molcluster/unsupervised_learning/transform.py'),
+                                                            'molcluster.unsupervised_learning.transform._as_csr': ( 'dimensionality_reduction.html#_as_csr',
+                                                                                                                    'molcluster/unsupervised_learning/transform.py'),
+                                                            'molcluster.unsupervised_learning.transform._init_transform_worker': ( 'dimensionality_reduction.html#_init_transform_worker',
+                                                                                                                                   'molcluster/unsupervised_learning/transform.py'),
+                                                            'molcluster.unsupervised_learning.transform._min_rows': ( 'dimensionality_reduction.html#_min_rows',
+                                                                                                                      'molcluster/unsupervised_learning/transform.py'),
+                                                            'molcluster.unsupervised_learning.transform._sample_indices': ( 'dimensionality_reduction.html#_sample_indices',
+                                                                                                                            'molcluster/unsupervised_learning/transform.py'),
+                                                            'molcluster.unsupervised_learning.transform._sample_rows': ( 'dimensionality_reduction.html#_sample_rows',
+                                                                                                                         'molcluster/unsupervised_learning/transform.py'),
+                                                            'molcluster.unsupervised_learning.transform._transform_chunks': ( 'dimensionality_reduction.html#_transform_chunks',
+                                                                                                                              'molcluster/unsupervised_learning/transform.py'),
+                                                            'molcluster.unsupervised_learning.transform._worker_transform': ( 'dimensionality_reduction.html#_worker_transform',
+                                                                                                                              'molcluster/unsupervised_learning/transform.py')},
+            'molcluster.unsupervised_learning.tuning': { 'molcluster.unsupervised_learning.tuning._ButinaTuning': ( 'tuning.html#_butinatuning',
+                                                                                                                    'molcluster/unsupervised_learning/tuning.py'),
+                                                         'molcluster.unsupervised_learning.tuning._ButinaTuning.labels': ( 'tuning.html#labels',
+                                                                                                                           'molcluster/unsupervised_learning/tuning.py'),
+                                                         'molcluster.unsupervised_learning.tuning._ButinaTuning.prepare_points': ( 'tuning.html#prepare_points',
+                                                                                                                                   'molcluster/unsupervised_learning/tuning.py'),
+                                                         'molcluster.unsupervised_learning.tuning._HDBSCANTuning': ( 'tuning.html#_hdbscantuning',
+                                                                                                                     'molcluster/unsupervised_learning/tuning.py'),
+                                                         'molcluster.unsupervised_learning.tuning._HDBSCANTuning.labels': ( 'tuning.html#labels',
+                                                                                                                            'molcluster/unsupervised_learning/tuning.py'),
+                                                         'molcluster.unsupervised_learning.tuning._HDBSCANTuning.refit': ( 'tuning.html#refit',
+                                                                                                                           'molcluster/unsupervised_learning/tuning.py'),
+                                                         'molcluster.unsupervised_learning.tuning._HierarchicalTuning': ( 'tuning.html#_hierarchicaltuning',
+                                                                                                                          'molcluster/unsupervised_learning/tuning.py'),
+                                                         'molcluster.unsupervised_learning.tuning._HierarchicalTuning.labels': ( 'tuning.html#labels',
+                                                                                                                                 'molcluster/unsupervised_learning/tuning.py'),
+                                                         'molcluster.unsupervised_learning.tuning._HierarchicalTuning.refit': ( 'tuning.html#refit',
+                                                                                                                                'molcluster/unsupervised_learning/tuning.py'),
+                                                         'molcluster.unsupervised_learning.tuning._TuningData': ( 'tuning.html#_tuningdata',
+                                                                                                                  'molcluster/unsupervised_learning/tuning.py'),
+                                                         'molcluster.unsupervised_learning.tuning._TuningData.__init__': ( 'tuning.html#__init__',
+                                                                                                                           'molcluster/unsupervised_learning/tuning.py'),
+                                                         'molcluster.unsupervised_learning.tuning._TuningData.cached': ( 'tuning.html#cached',
+                                                                                                                         'molcluster/unsupervised_learning/tuning.py'),
+                                                         'molcluster.unsupervised_learning.tuning._TuningData.labels': ( 'tuning.html#labels',
+                                                                                                                         'molcluster/unsupervised_learning/tuning.py'),
+                                                         'molcluster.unsupervised_learning.tuning._TuningData.points': ( 'tuning.html#points',
+                                                                                                                         'molcluster/unsupervised_learning/tuning.py'),
+                                                         'molcluster.unsupervised_learning.tuning._TuningData.prepare_points': ( 'tuning.html#prepare_points',
+                                                                                                                                 'molcluster/unsupervised_learning/tuning.py'),
+                                                         'molcluster.unsupervised_learning.tuning._TuningData.refit': ( 'tuning.html#refit',
+                                                                                                                        'molcluster/unsupervised_learning/tuning.py'),
+                                                         'molcluster.unsupervised_learning.tuning._TuningData.score': ( 'tuning.html#score',
+                                                                                                                        'molcluster/unsupervised_learning/tuning.py'),
+                                                         'molcluster.unsupervised_learning.tuning._suggest': ( 'tuning.html#_suggest',
+                                                                                                               'molcluster/unsupervised_learning/tuning.py'),
+                                                         'molcluster.unsupervised_learning.tuning.tune_clustering': ( 'tuning.html#tune_clustering',
+                                                                                                                      'molcluster/unsupervised_learning/tuning.py')},
+            'molcluster.unsupervised_learning.validation': { 'molcluster.unsupervised_learning.validation.Estimate': ( 'validation.html#estimate',
+                                                                                                                       'molcluster/unsupervised_learning/validation.py'),
+                                                             'molcluster.unsupervised_learning.validation._Points': ( 'validation.html#_points',
+                                                                                                                      'molcluster/unsupervised_learning/validation.py'),
+                                                             'molcluster.unsupervised_learning.validation._Points.__init__': ( 'validation.html#__init__',
+                                                                                                                               'molcluster/unsupervised_learning/validation.py'),
+                                                             'molcluster.unsupervised_learning.validation._Points.__len__': ( 'validation.html#__len__',
+                                                                                                                              'molcluster/unsupervised_learning/validation.py'),
+                                                             'molcluster.unsupervised_learning.validation._Points.distances': ( 'validation.html#distances',
+                                                                                                                                'molcluster/unsupervised_learning/validation.py'),
+                                                             'molcluster.unsupervised_learning.validation._Points.take': ( 'validation.html#take',
+                                                                                                                           'molcluster/unsupervised_learning/validation.py'),
+                                                             'molcluster.unsupervised_learning.validation._clustered': ( 'validation.html#_clustered',
+                                                                                                                         'molcluster/unsupervised_learning/validation.py'),
+                                                             'molcluster.unsupervised_learning.validation._dbcv_cluster': ( 'validation.html#_dbcv_cluster',
+                                                                                                                            'molcluster/unsupervised_learning/validation.py'),
+                                                             'molcluster.unsupervised_learning.validation._dbcv_separation_rows': ( 'validation.html#_dbcv_separation_rows',
+                                                                                                                                    'molcluster/unsupervised_learning/validation.py'),
+                                                             'molcluster.unsupervised_learning.validation._init_validation_worker': ( 'validation.html#_init_validation_worker',
+                                                                                                                                      'molcluster/unsupervised_learning/validation.py'),
+                                                             'molcluster.unsupervised_learning.validation._map_tasks': ( 'validation.html#_map_tasks',
+                                                                                                                         'molcluster/unsupervised_learning/validation.py'),
+                                                             'molcluster.unsupervised_learning.validation._row_blocks': ( 'validation.html#_row_blocks',
+                                                                                                                          'molcluster/unsupervised_learning/validation.py'),
+                                                             'molcluster.unsupervised_learning.validation._silhouette_rows': ( 'validation.html#_silhouette_rows',
+                                                                                                                               'molcluster/unsupervised_learning/validation.py'),
+                                                             'molcluster.unsupervised_learning.validation._tanimoto_stats_rows': ( 'validation.html#_tanimoto_stats_rows',
+                                                                                                                                   'molcluster/unsupervised_learning/validation.py'),
+                                                             'molcluster.unsupervised_learning.validation._worker_call': ( 'validation.html#_worker_call',
+                                                                                                                           'molcluster/unsupervised_learning/validation.py'),
+                                                             'molcluster.unsupervised_learning.validation.davies_bouldin_score': ( 'validation.html#davies_bouldin_score',
+                                                                                                                                   'molcluster/unsupervised_learning/validation.py'),
+                                                             'molcluster.unsupervised_learning.validation.dbcv_score': ( 'validation.html#dbcv_score',
+                                                                                                                         'molcluster/unsupervised_learning/validation.py'),
+                                                             'molcluster.unsupervised_learning.validation.estimate_score': ( 'validation.html#estimate_score',
+                                                                                                                             'molcluster/unsupervised_learning/validation.py'),
+                                                             'molcluster.unsupervised_learning.validation.silhouette_samples': ( 'validation.html#silhouette_samples',
+                                                                                                                                 'molcluster/unsupervised_learning/validation.py'),
+                                                             'molcluster.unsupervised_learning.validation.silhouette_score': ( 'validation.html#silhouette_score',
+                                                                                                                               'molcluster/unsupervised_learning/validation.py'),
+                                                             'molcluster.unsupervised_learning.validation.tanimoto_cluster_stats': ( 'validation.html#tanimoto_cluster_stats',
+                                                                                                                                     'molcluster/unsupervised_learning/validation.py')},
             'molcluster.viz': { 'molcluster.viz.ChemVisualiser': ('viz.html#chemvisualiser', 'molcluster/viz.py'),
                                 'molcluster.viz.ChemVisualiser.__init__': ('viz.html#__init__', 'molcluster/viz.py'),
                                 'molcluster.viz.ChemVisualiser.plot_simple_chemical_space': ( 'viz.html#plot_simple_chemical_space',
-                                                                                              'molcluster/viz.py')}}}
\ No newline at end of file
+                                                                                              'molcluster/viz.py'),
+                                'molcluster.viz._style_axes': ('viz.html#_style_axes', 'molcluster/viz.py'),
+                                'molcluster.viz.plot_dendrogram': ('viz.html#plot_dendrogram', 'molcluster/viz.py'),
+                                'molcluster.viz.plot_elbow': ('viz.html#plot_elbow', 'molcluster/viz.py')}}}
\ No newline at end of file
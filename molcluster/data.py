@@ -0,0 +1,84 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../notebooks/data.ipynb.
+
+# %% auto 0
+__all__ = ['load_array', 'as_array', 'is_chunked', 'iter_chunks', 'n_chunks']
+
+# %% ../notebooks/data.ipynb 3
+from pathlib import Path
+
+import numpy as np
+
+from .typing_basics import *
+from .fingerprints import FingerprintMatrix
+
+# %% ../notebooks/data.ipynb 5
+def load_array(data, mmap_mode:str='r'):
+    
+    """Return `data` as an array, memory-mapping it if it is the path to a `.npy` file.
+    
+    Arrays and other objects are returned unchanged, so that slices of a `np.memmap` are only read when they are used.
+    
+    """
+    
+    if isinstance(data, (str, Path)):
+        return np.load(data, mmap_mode=mmap_mode)
+    return data
+
+def as_array(data, dtype=np.float32):
+    
+    """Return `data` as an array for estimators that need dense features.
+    
+    A `FingerprintMatrix` is expanded to a dense `dtype` array, the path to a `.npy` file is memory-mapped and arrays are
+    returned unchanged.
+    
+    """
+    
+    if isinstance(data, FingerprintMatrix):
+        return data.to_dense(dtype=dtype)
+    return load_array(data)
+
+def is_chunked(data):
+    "Whether `data` is a chunk source (a callable or an iterator) instead of an array or a `.npy` path"
+    return callable(data) or (not isinstance(data, (str, Path)) and not hasattr(data, 'shape') and iter(data) is data)
+
+def iter_chunks(data, chunk_size:int=10000, dtype=None):
+    
+    """Iterate over the rows of `data` in chunks of at most `chunk_size` rows.
+    
+    Only one chunk is held in memory at a time, so memory use does not depend on the number of rows.
+    
+    Arguments:
+    
+        data : array, FingerprintMatrix, str, callable or iterator
+            A (possibly memory-mapped) array or `FingerprintMatrix` (expanded to dense float32 chunks), the path to a `.npy` file, a callable that returns a new iterator of chunks each
+            time it is called, or an iterator of chunks. Iterators can only be read once; use a callable for sources that need
+            several passes. Chunks from callables and iterators are yielded as they are, whatever their size.
+            
+        chunk_size : int, optional (default=10000)
+            Number of rows per chunk for arrays and `.npy` files
+            
+        dtype : optional
+            If given, chunks are converted to this dtype
+            
+    Yields:
+    
+        chunk : np.array
+    
+    """
+    
+    data = load_array(data)
+    if callable(data):
+        chunks = data()
+    elif hasattr(data, 'shape'):
+        chunks = (data[start:start+chunk_size] for start in range(0, data.shape[0], chunk_size))
+    else:
+        chunks = data
+    for chunk in chunks:
+        yield np.asarray(chunk, dtype=dtype)
+
+def n_chunks(data, chunk_size:int=10000):
+    "Number of chunks `iter_chunks` yields for `data`, or None if it is not known in advance"
+    data = load_array(data)
+    if hasattr(data, 'shape'):
+        return -(-data.shape[0] // chunk_size)
+    return None
@@ -0,0 +1,763 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../notebooks/fingerprints.ipynb.
+
+# %% auto 0
+__all__ = ['register_fingerprint', 'available_fingerprints', 'get_fingerprint_function', 'popcount', 'pack_fingerprints',
+           'unpack_fingerprints', 'pack_array', 'FingerprintMatrix', 'smiles_to_fps', 'featurize', 'FingerprintStore']
+
+# %% ../notebooks/fingerprints.ipynb 3
+import os
+import json
+from collections import OrderedDict, defaultdict
+from pathlib import Path
+from typing import Callable
+from functools import partial
+from itertools import islice
+
+import numpy as np
+from tqdm.auto import tqdm
+from rdkit import Chem, DataStructs
+from rdkit.Chem import MACCSkeys, rdFingerprintGenerator
+
+from .typing_basics import *
+
+# %% ../notebooks/fingerprints.ipynb 5
+_FINGERPRINTS = {}
+
+def register_fingerprint(name:str, factory:Callable=None):
+    
+    """Register a new fingerprint type under `name`.
+    
+    Arguments:
+    
+        name : str
+            Name used to select the fingerprint, e.g. `ButinaClustering(smiles, fp_type=name)`.
+            
+        factory : callable, optional (default=None)
+            Called as `factory(nbits=nbits, radius=radius)` and returns a function that takes a RDKit molecule
+            and returns its fingerprint. If None, `register_fingerprint` works as a decorator.
+    
+    """
+    
+    def _register(f):
+        _FINGERPRINTS[name] = f
+        return f
+    return _register if factory is None else _register(factory)
+
+def available_fingerprints():
+    "Names of the registered fingerprint types"
+    return list(_FINGERPRINTS)
+
+def get_fingerprint_function(fp_type:str, nbits:int=2048, radius:int=2):
+    
+    """Returns a function that computes fingerprints of type `fp_type` for a single molecule.
+    
+    The underlying RDKit generator is created once, so the returned function can be reused for every molecule in a dataset.
+    
+    Arguments:
+    
+        fp_type : str
+            A registered fingerprint type (see `available_fingerprints`).
+            
+        nbits : int, optional (default=2048)
+            Number of bits of the fingerprints, if supported by `fp_type`.
+            
+        radius : int, optional (default=2)
+            Radius of the fingerprints, if supported by `fp_type`.
+            
+    Returns:
+    
+        fp_func : callable
+    
+    """
+    
+    if _FINGERPRINTS.get(fp_type) is None:
+        raise KeyError(f"No fingerprint method defined for {fp_type}")
+    return _FINGERPRINTS[fp_type](nbits=nbits, radius=radius)
+
+@register_fingerprint('morgan2')
+def _morgan_fp(nbits:int=2048, radius:int=2):
+    return rdFingerprintGenerator.GetMorganGenerator(radius=radius, fpSize=nbits).GetFingerprint
+
+@register_fingerprint('rdkit')
+def _rdkit_fp(nbits:int=2048, radius:int=2):
+    # Same as `Chem.RDKFingerprint` with default parameters
+    return rdFingerprintGenerator.GetRDKitFPGenerator().GetFingerprint
+
+@register_fingerprint('maccs')
+def _maccs_fp(nbits:int=167, radius:int=2):
+    return MACCSkeys.GenMACCSKeys
+
+@register_fingerprint('ap')
+def _atom_pair_fp(nbits:int=2048, radius:int=2):
+    # Count-based atom pairs, as `rdkit.Chem.AtomPairs.Pairs.GetAtomPairFingerprint`
+    return rdFingerprintGenerator.GetAtomPairGenerator().GetSparseCountFingerprint
+
+# %% ../notebooks/fingerprints.ipynb 11
+def popcount(x:ArrayLike, axis:int=-1):
+    "Number of set bits of an unsigned integer array `x`, summed over `axis`"
+    x = np.asarray(x)
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(x).sum(axis=axis, dtype=np.int64)
+    # numpy < 2.0
+    lut = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(1)
+    x = np.ascontiguousarray(x)
+    counts = lut[x.view(np.uint8)].reshape(*x.shape, x.itemsize).sum(axis=-1, dtype=np.int64)
+    return counts.sum(axis=axis, dtype=np.int64)
+
+def _pad_bytes(bits:ArrayLike):
+    "Pad the rows of a packed uint8 matrix to a multiple of 8 bytes, so it can be viewed as uint64"
+    pad = -bits.shape[1] % 8
+    if pad:
+        bits = np.pad(bits, ((0, 0), (0, pad)))
+    return np.ascontiguousarray(bits)
+
+def _check_bit_vector(fp):
+    "Raise a `TypeError` if `fp` is not an RDKit `ExplicitBitVect`, the only fingerprints that can be packed"
+    if not isinstance(fp, DataStructs.ExplicitBitVect):
+        raise TypeError(f"Packed fingerprints need bit vectors, got {type(fp).__name__}")
+
+def pack_fingerprints(fp_list:List):
+    
+    """Convert a list of RDKit bit vector fingerprints to a packed bit matrix.
+    
+    Arguments:
+    
+        fp_list : list
+            A list of `ExplicitBitVect` with the same number of bits.
+            
+    Returns:
+    
+        bits : np.array
+            Packed fingerprints (uint8) with shape (n, nbytes). Bit `k` of a fingerprint is bit `k % 8` (little-endian) of byte `k // 8`,
+            and rows are zero-padded to a multiple of 8 bytes.
+            
+        counts : np.array
+            Number of bits set in each fingerprint.
+    
+    """
+    
+    if len(fp_list):
+        _check_bit_vector(fp_list[0])
+    nbytes = (fp_list[0].GetNumBits() + 7) // 8 if len(fp_list) else 0
+    bits = np.frombuffer(b''.join(DataStructs.BitVectToBinaryText(fp) for fp in fp_list), dtype=np.uint8)
+    bits = _pad_bytes(bits.reshape(len(fp_list), nbytes))
+    return bits, popcount(bits)
+
+def unpack_fingerprints(bits:ArrayLike, nbits:int):
+    "Convert packed fingerprints back to a list of RDKit `ExplicitBitVect` with `nbits` bits"
+    dense = np.unpackbits(np.asarray(bits), axis=1, count=nbits, bitorder='little')
+    fp_list = []
+    for row in dense:
+        fp = DataStructs.ExplicitBitVect(nbits)
+        fp.SetBitsFromList(np.flatnonzero(row).tolist())
+        fp_list.append(fp)
+    return fp_list
+
+def pack_array(X:ArrayLike):
+    
+    """Pack a dense binary matrix with shape (n, nbits) into the same format as `pack_fingerprints`.
+    
+    Returns:
+    
+        bits : np.array
+        
+        counts : np.array
+    
+    """
+    
+    bits = _pad_bytes(np.packbits(np.asarray(X) != 0, axis=1, bitorder='little'))
+    return bits, popcount(bits)
+
+# %% ../notebooks/fingerprints.ipynb 15
+class FingerprintMatrix:
+    
+    """Binary fingerprints stored as a packed bit matrix, together with the number of bits set in each row.
+    
+    Attributes:
+    
+        bits : np.array
+            Packed fingerprints (uint8) with shape (n, nbytes), in the format of `pack_fingerprints`. It can be a `np.memmap`.
+            
+        counts : np.array
+            Number of bits set in each fingerprint.
+            
+        nbits : int
+            Number of bits per fingerprint.
+            
+    Converting the matrix with `np.asarray` expands it to a dense float32 array with shape (n, nbits).
+    
+    """
+    
+    def __init__(self, bits:ArrayLike, counts:ArrayLike=None, nbits:int=None):
+        self.bits = bits if bits.shape[1] % 8 == 0 else _pad_bytes(bits)
+        self.counts = popcount(self.bits) if counts is None else np.asarray(counts)
+        self.nbits = bits.shape[1] * 8 if nbits is None else nbits
+        
+    @classmethod
+    def from_fps(cls, fp_list:List):
+        "Pack a list of RDKit `ExplicitBitVect`"
+        bits, counts = pack_fingerprints(fp_list)
+        return cls(bits, counts, nbits=fp_list[0].GetNumBits() if len(fp_list) else 0)
+    
+    @classmethod
+    def from_array(cls, X:ArrayLike):
+        "Pack a dense binary matrix with shape (n, nbits)"
+        X = np.asarray(X)
+        return cls(*pack_array(X), nbits=X.shape[1])
+    
+    @property
+    def shape(self):
+        return (len(self.bits), self.nbits)
+    
+    @property
+    def nbytes(self):
+        return self.bits.nbytes + self.counts.nbytes
+    
+    def __len__(self):
+        return len(self.bits)
+    
+    def __getitem__(self, idx):
+        "Rows `idx` as a new `FingerprintMatrix`"
+        if np.isscalar(idx):
+            idx = slice(idx, idx + 1 if idx != -1 else None)
+        return FingerprintMatrix(self.bits[idx], self.counts[idx], self.nbits)
+    
+    def __repr__(self):
+        return f"FingerprintMatrix(n={len(self)}, nbits={self.nbits})"
+    
+    def to_dense(self, start:int=0, stop:int=None, dtype=np.float32):
+        "Dense 0/1 array of rows `start:stop`"
+        return np.unpackbits(self.bits[start:stop], axis=1, count=self.nbits, bitorder='little').astype(dtype, copy=False)
+    
+    def iter_dense(self, block_size:int=10000, dtype=np.float32):
+        "Dense blocks of at most `block_size` rows"
+        for start in range(0, len(self), block_size):
+            yield self.to_dense(start, start + block_size, dtype)
+    
+    def to_csr(self, block_size:int=10000, dtype=np.float32):
+        "Sparse CSR matrix of the bits that are set, unpacked `block_size` rows at a time so the dense matrix is never built"
+        from scipy.sparse import csr_matrix
+
+        indptr = np.concatenate([[0], np.cumsum(self.counts, dtype=np.int64)])
+        indices = np.empty(indptr[-1], dtype=np.int32)
+        for start in range(0, len(self), block_size):
+            _, cols = np.nonzero(self.to_dense(start, start + block_size, np.uint8))
+            indices[indptr[start]:indptr[min(start + block_size, len(self))]] = cols
+        return csr_matrix((np.ones(len(indices), dtype=dtype), indices, indptr), shape=self.shape)
+    
+    def __array__(self, dtype=None, copy=None):
+        return self.to_dense(dtype=np.float32 if dtype is None else dtype)
+    
+    def to_fps(self):
+        "Unpack to a list of RDKit `ExplicitBitVect`"
+        return unpack_fingerprints(self.bits, self.nbits)
+    
+    def save(self, path):
+        "Save to the directory `path`, which can then be loaded (and memory-mapped) with `FingerprintMatrix.load`"
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        np.save(path/'bits.npy', self.bits)
+        np.save(path/'counts.npy', self.counts)
+        (path/'meta.json').write_text(json.dumps({'nbits': self.nbits}))
+        
+    @classmethod
+    def load(cls, path, mmap_mode:str='r'):
+        "Load a matrix saved with `FingerprintMatrix.save`, memory-mapped by default"
+        path = Path(path)
+        meta = json.loads((path/'meta.json').read_text())
+        return cls(np.load(path/'bits.npy', mmap_mode=mmap_mode), np.load(path/'counts.npy'), meta['nbits'])
+
+# %% ../notebooks/fingerprints.ipynb 19
+def _effective_n_jobs(n_jobs:int=1):
+    "Number of workers for `n_jobs`. As in joblib, None is 1 and negative values count back from the number of CPUs (-1 uses all)"
+    if n_jobs is None:
+        return 1
+    if n_jobs == 0:
+        raise ValueError("n_jobs == 0 has no meaning, use a positive number of workers or -1 for all CPUs")
+    return n_jobs if n_jobs > 0 else max(1, (os.cpu_count() or 1) + 1 + n_jobs)
+
+def _chunked(iterable, size:int):
+    it = iter(iterable)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+def _smiles_chunk_to_fps(smiles:List, fp_type:str, nbits:int, radius:int, canonical:bool=False):
+    "Fingerprints of the valid SMILES in `smiles`, the positions of the invalid ones and, if `canonical`, the canonical SMILES of the valid ones"
+    fp_func = get_fingerprint_function(fp_type, nbits, radius)
+    fps, invalid, canonical_smiles = [], [], []
+    for i, smi in enumerate(smiles):
+        mol = Chem.MolFromSmiles(smi) if isinstance(smi, str) else None
+        if mol is None:
+            invalid.append(i)
+            continue
+        fps.append(fp_func(mol))
+        if canonical:
+            canonical_smiles.append(Chem.MolToSmiles(mol))
+    return fps, invalid, canonical_smiles
+
+def _map_chunks(func:Callable, chunks:Iterator, n_jobs:int=1):
+    "Apply `func` to each chunk, in order, optionally in a process pool"
+    n_jobs = _effective_n_jobs(n_jobs)
+    if n_jobs == 1:
+        yield from map(func, chunks)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            yield from pool.map(func, chunks)
+
+def smiles_to_fps(smiles:Iterator, fp_type:str='rdkit', nbits:int=2048, radius:int=2, n_jobs:int=1, chunk_size:int=10000,
+                  progress:bool=True):
+    
+    """Parse SMILES and calculate their fingerprints in chunks, optionally across a process pool.
+    
+    Only the fingerprints are kept; each molecule is discarded as soon as its fingerprint is computed. SMILES that
+    cannot be parsed are reported by index instead of raising an error.
+    
+    Arguments:
+    
+        smiles : iterable
+            SMILES strings. Any iterable works, so large files can be streamed.
+            
+        fp_type : str, optional (default='rdkit')
+            A registered fingerprint type (see `available_fingerprints`). With `n_jobs > 1`, types registered at runtime are
+            only available in the workers if processes are forked (the default on Linux).
+            
+        nbits : int, optional (default=2048)
+            Number of bits of the fingerprints, if supported by `fp_type`.
+            
+        radius : int, optional (default=2)
+            Radius of the fingerprints, if supported by `fp_type`.
+            
+        n_jobs : int, optional (default=1)
+            Number of processes. -1 uses all CPUs.
+            
+        chunk_size : int, optional (default=10000)
+            Number of SMILES sent to a worker at a time.
+            
+        progress : bool, optional (default=True)
+            Show a progress bar.
+            
+    Returns:
+    
+        fp_list : list
+            Fingerprints of the valid SMILES, in input order.
+            
+        invalid_idx : np.array
+            Positions of the SMILES that could not be parsed.
+    
+    """
+    
+    chunks = _chunked(smiles, chunk_size)
+    worker = partial(_smiles_chunk_to_fps, fp_type=fp_type, nbits=nbits, radius=radius)
+    pbar = tqdm(desc="Calculating Fingerprints", unit='chunk', disable=not progress)
+    
+    fp_list, invalid_idx, offset = [], [], 0
+    for fps, invalid, _ in _map_chunks(worker, chunks, n_jobs):
+        invalid_idx.extend(offset + i for i in invalid)
+        offset += len(fps) + len(invalid)
+        fp_list.extend(fps)
+        pbar.update()
+    pbar.close()
+    return fp_list, np.array(invalid_idx, dtype=np.int64)
+
+# %% ../notebooks/fingerprints.ipynb 24
+def _smiles_column(smiles, column:str=None):
+    "The SMILES of `smiles`, or of its column `column` if it is a DataFrame"
+    if column is not None:
+        return smiles[column]
+    if hasattr(smiles, 'columns'):
+        raise ValueError("Pass the `column` that holds the SMILES of the DataFrame")
+    return smiles
+
+def _descriptor(func:Callable, mol):
+    try:
+        return func(mol)
+    except Exception:
+        return np.nan
+
+def _smiles_chunk_to_features(smiles:List, fp_type:str, nbits:int, radius:int, dense:bool, dtype, descriptors:List):
+    "Feature rows of the valid SMILES in `smiles`, the positions of the invalid ones and the number of bits of the fingerprints"
+    if fp_type == 'descriptors':
+        from rdkit.Chem import Descriptors
+        funcs = dict(Descriptors.descList)
+        rows, invalid = [], []
+        for i, smi in enumerate(smiles):
+            mol = Chem.MolFromSmiles(smi) if isinstance(smi, str) else None
+            if mol is None:
+                invalid.append(i)
+                continue
+            rows.append([_descriptor(funcs[name], mol) for name in descriptors])
+        return np.array(rows, dtype=dtype).reshape(len(rows), len(descriptors)), invalid, None
+    fps, invalid, _ = _smiles_chunk_to_fps(smiles, fp_type, nbits, radius)
+    if not fps:
+        return None, invalid, None
+    bits, _ = pack_fingerprints(fps)
+    fp_nbits = fps[0].GetNumBits()
+    return (np.unpackbits(bits, axis=1, count=fp_nbits, bitorder='little').astype(dtype) if dense else bits), invalid, fp_nbits
+
+class _NpyWriter:
+    
+    "Append rows to a `.npy` file whose number of rows is only known when it is closed"
+    
+    header_size = 128
+    
+    def __init__(self, path, dtype):
+        self.path, self.dtype = Path(path), np.dtype(dtype)
+        self.file, self.n_rows, self.n_columns = open(self.path, 'wb'), 0, 0
+        self.file.write(b'\0' * self.header_size)
+        
+    def write(self, rows:np.ndarray):
+        self.n_columns = rows.shape[1]
+        np.ascontiguousarray(rows, dtype=self.dtype).tofile(self.file)
+        self.n_rows += len(rows)
+        
+    def close(self, mmap_mode:str='r'):
+        "Write the header and memory-map the file"
+        header = "{'descr': %r, 'fortran_order': False, 'shape': (%d, %d), }" % (
+            np.lib.format.dtype_to_descr(self.dtype), self.n_rows, self.n_columns)
+        header = header.ljust(self.header_size - 11) + '\n'
+        self.file.seek(0)
+        self.file.write(np.lib.format.MAGIC_PREFIX + b'\x01\x00' + len(header).to_bytes(2, 'little') + header.encode('latin1'))
+        self.file.close()
+        return np.load(self.path, mmap_mode=mmap_mode)
+
+def featurize(smiles:Iterator, fp_type:str='rdkit', nbits:int=2048, radius:int=2, dense:bool=False, dtype=np.float32,
+              column:str=None, descriptors:List=None, out=None, n_jobs:int=1, chunk_size:int=10000, progress:bool=True):
+    
+    """Turn SMILES into a feature matrix for the clusterers and transforms, in chunks, optionally across a process pool.
+    
+    The workers return packed (or dense) rows instead of RDKit objects, so little data is sent between processes, and the
+    rows are appended to the result, or to a `.npy` file with `out`, one chunk at a time.
+    
+    Arguments:
+    
+        smiles : iterable or DataFrame
+            SMILES strings, or a DataFrame with the SMILES in `column`. Any iterable works, so large files can be streamed.
+            
+        fp_type : str, optional (default='rdkit')
+            A registered bit vector fingerprint type (see `available_fingerprints`), or 'descriptors' for RDKit descriptors.
+            
+        nbits : int, optional (default=2048)
+            Number of bits of the fingerprints, if supported by `fp_type`.
+            
+        radius : int, optional (default=2)
+            Radius of the fingerprints, if supported by `fp_type`.
+            
+        dense : bool, optional (default=False)
+            Return fingerprints as a dense `dtype` array instead of a `FingerprintMatrix`. Descriptors are always dense.
+            
+        dtype : optional (default=np.float32)
+            Type of the dense arrays
+            
+        column : str, optional (default=None)
+            Column of `smiles` that holds the SMILES, if it is a DataFrame
+            
+        descriptors : list, optional (default=None)
+            Names of the descriptors (in `rdkit.Chem.Descriptors.descList`) for `fp_type='descriptors'`. Defaults to all of
+            them. Descriptors that cannot be computed for a molecule are NaN, values outside the range of `dtype` (e.g. `Ipc`
+            in float32) are inf.
+            
+        out : str or Path, optional (default=None)
+            Write the features to this `.npy` file (or, for a `FingerprintMatrix`, this directory, see `FingerprintMatrix.save`)
+            and return them memory-mapped, so the matrix never has to fit in memory.
+            
+        n_jobs : int, optional (default=1)
+            Number of processes. -1 uses all CPUs.
+            
+        chunk_size : int, optional (default=10000)
+            Number of SMILES sent to a worker at a time.
+            
+        progress : bool, optional (default=True)
+            Show a progress bar.
+            
+    Returns:
+    
+        X : FingerprintMatrix or np.array
+            Features of the valid SMILES, in input order.
+            
+        invalid_idx : np.array
+            Positions of the SMILES that could not be parsed.
+    
+    """
+    
+    if fp_type == 'descriptors':
+        from rdkit.Chem import Descriptors
+        names = [name for name, _ in Descriptors.descList]
+        descriptors = names if descriptors is None else list(descriptors)
+        unknown = set(descriptors) - set(names)
+        if unknown:
+            raise ValueError(f"Unknown descriptors {sorted(unknown)}, see `rdkit.Chem.Descriptors.descList`")
+        dense = True
+    else:
+        # fails early for unknown types
+        get_fingerprint_function(fp_type, nbits, radius)
+    packed = not dense
+    if out is not None:
+        out = Path(out)
+        if packed:
+            out.mkdir(parents=True, exist_ok=True)
+        writer = _NpyWriter(out/'bits.npy' if packed else out, np.uint8 if packed else dtype)
+    
+    chunks = _chunked(_smiles_column(smiles, column), chunk_size)
+    worker = partial(_smiles_chunk_to_features, fp_type=fp_type, nbits=nbits, radius=radius, dense=dense, dtype=dtype,
+                     descriptors=descriptors)
+    pbar = tqdm(desc="Featurizing", unit='chunk', disable=not progress)
+    
+    rows, counts, invalid_idx, offset, fp_nbits = [], [], [], 0, None
+    for chunk_rows, invalid, chunk_nbits in _map_chunks(worker, chunks, n_jobs):
+        invalid_idx.extend(offset + i for i in invalid)
+        offset += len(invalid) + (0 if chunk_rows is None else len(chunk_rows))
+        if chunk_rows is not None:
+            fp_nbits = chunk_nbits
+            if packed:
+                counts.append(popcount(chunk_rows))
+            if out is None:
+                rows.append(chunk_rows)
+            else:
+                writer.write(chunk_rows)
+        pbar.update()
+    pbar.close()
+    invalid_idx = np.array(invalid_idx, dtype=np.int64)
+    
+    if out is not None:
+        X = writer.close()
+    elif rows:
+        X = np.concatenate(rows)
+    else:
+        X = np.empty((0, len(descriptors) if fp_type == 'descriptors' else 0), dtype=np.uint8 if packed else dtype)
+    if not packed:
+        return X, invalid_idx
+    counts = np.concatenate(counts) if counts else np.empty(0, dtype=np.int64)
+    if out is not None:
+        np.save(out/'counts.npy', counts)
+        (out/'meta.json').write_text(json.dumps({'nbits': fp_nbits or 0}))
+    return FingerprintMatrix(X, counts, fp_nbits or 0), invalid_idx
+
+# %% ../notebooks/fingerprints.ipynb 29
+class _StoreTable:
+    
+    "Fingerprints of a single (fp_type, nbits, radius) in a `FingerprintStore`: a memory-mapped bit matrix plus a JSON index"
+    
+    def __init__(self, path:Path, max_size:int):
+        self.path, self.max_size = path, max_size
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.index = OrderedDict() # key -> slot (-1 for invalid SMILES), least recently used first
+        self.slot_keys = defaultdict(list) # slot -> keys, a fingerprint can be stored under several SMILES
+        self.nbits, self.n_slots, self.bits = None, 0, None
+        if (self.path/'index.json').exists():
+            meta = json.loads((self.path/'index.json').read_text())
+            if meta['max_size'] > max_size:
+                raise ValueError(f"{self.path} was created with max_size={meta['max_size']} and cannot be shrunk to {max_size}")
+            for key, slot in meta['entries']:
+                self.index[key] = slot
+                self.slot_keys[slot].append(key)
+            self.nbits, self.n_slots = meta['nbits'], meta['n_slots']
+            if self.nbits is not None:
+                self._open_bits()
+            
+    def _open_bits(self):
+        nbytes = -(-self.nbits // 64) * 8
+        fname = self.path/'fingerprints.bin'
+        if not fname.exists() or fname.stat().st_size < self.max_size * nbytes:
+            # Sparse file: disk blocks are only allocated when written
+            with open(fname, 'ab') as f:
+                f.truncate(self.max_size * nbytes)
+        self.bits = np.memmap(fname, dtype=np.uint8, mode='r+', shape=(self.max_size, nbytes))
+        
+    def lookup(self, key:str):
+        "Slot of `key` (marked as recently used), or None"
+        slot = self.index.get(key)
+        if slot is not None:
+            self.index.move_to_end(key)
+        return slot
+    
+    def alias(self, key:str, slot:int):
+        "Store `key` as another name of the fingerprint in `slot`"
+        if key not in self.index:
+            self.index[key] = slot
+            self.slot_keys[slot].append(key)
+        
+    def add(self, key:str, fp_bits=None):
+        "Store the packed fingerprint of `key` and return its slot. If `fp_bits` is None `key` is marked as invalid."
+        if fp_bits is None:
+            self.alias(key, -1)
+            return -1
+        if self.bits is None:
+            self.nbits = self.nbits or len(fp_bits) * 8
+            self._open_bits()
+        if self.n_slots < self.max_size:
+            slot = self.n_slots
+            self.n_slots += 1
+        else:
+            # Evict the least recently used fingerprint, with all its keys, and reuse its slot
+            slot = -1
+            while slot < 0:
+                _, slot = self.index.popitem(last=False)
+            for k in self.slot_keys.pop(slot):
+                self.index.pop(k, None)
+        self.bits[slot] = fp_bits
+        self.alias(key, slot)
+        return slot
+        
+    def flush(self):
+        if self.bits is not None:
+            self.bits.flush()
+        meta = {'nbits': self.nbits, 'max_size': self.max_size, 'n_slots': self.n_slots, 'entries': list(self.index.items())}
+        tmp = self.path/'index.json.tmp'
+        tmp.write_text(json.dumps(meta))
+        tmp.replace(self.path/'index.json')
+
+# %% ../notebooks/fingerprints.ipynb 30
+class FingerprintStore:
+    
+    """Persistent on-disk cache of fingerprints.
+    
+    Fingerprints are keyed by (canonical SMILES, fp_type, nbits, radius). Each combination of fingerprint parameters is
+    stored in its own sub-directory of `path`, as a memory-mapped packed bit matrix plus a JSON index. When the store is
+    full, the least recently used fingerprints are evicted.
+    
+    The SMILES passed to `get_fps` are first looked up as they are, so cache hits on canonical SMILES skip RDKit entirely.
+    Other SMILES are parsed and looked up by their canonical form. Precomputed keys, e.g. InChIKeys, can be used instead.
+    
+    Attributes:
+    
+        path : str or Path
+            Directory of the store. It is created if it does not exist.
+            
+        max_size : int
+            Maximum number of fingerprints stored per fingerprint type.
+            
+        hits, misses : int
+            Number of fingerprints found in / added to the store.
+            
+            
+    Methods:
+    
+        get_fps(smiles, fp_type, nbits, radius)
+            Fingerprints of `smiles`, computing only those that are not stored yet.
+    
+    """
+    
+    def __init__(self, path, max_size:int=10_000_000):
+        self.path = Path(path)
+        self.max_size = max_size
+        self.hits = self.misses = 0
+        self._tables = {}
+        
+    def _table(self, fp_type:str, nbits:int, radius:int):
+        key = f'{fp_type}-{nbits}-{radius}'
+        if key not in self._tables:
+            self._tables[key] = _StoreTable(self.path/key, self.max_size)
+        return self._tables[key]
+    
+    def get_fps(self, smiles:List, fp_type:str='rdkit', nbits:int=2048, radius:int=2, keys:List=None, n_jobs:int=1,
+                chunk_size:int=10000):
+        
+        """Packed fingerprints of `smiles`, read from the store when possible.
+        
+        Arguments:
+        
+            smiles : list
+                SMILES strings.
+                
+            fp_type, nbits, radius : optional
+                Fingerprint parameters, see `get_fingerprint_function`. Only bit vector fingerprints can be stored.
+                
+            keys : list, optional (default=None)
+                Keys to use instead of the canonical SMILES, e.g. InChIKeys. Lookups by key never call RDKit.
+                
+            n_jobs : int, optional (default=1)
+                Number of processes used to compute the missing fingerprints.
+                
+            chunk_size : int, optional (default=10000)
+                Number of SMILES sent to a worker at a time.
+                
+        Returns:
+        
+            bits : np.array
+                Packed fingerprints of the valid SMILES (see `pack_fingerprints`).
+                
+            counts : np.array
+                Number of bits set in each fingerprint.
+                
+            invalid_idx : np.array
+                Positions of the SMILES that could not be parsed.
+        
+        """
+        
+        table = self._table(fp_type, nbits, radius)
+        lookup_keys = list(smiles) if keys is None else list(keys)
+        n = len(lookup_keys)
+        invalid = np.zeros(n, dtype=bool)
+        out = None
+        def _write(p, row):
+            nonlocal out
+            if out is None:
+                out = np.zeros((n, len(row)), dtype=np.uint8)
+            out[p] = row
+        
+        missing = []
+        for p, key in enumerate(lookup_keys):
+            slot = table.lookup(key)
+            if slot is None:
+                missing.append(p)
+            elif slot < 0:
+                invalid[p] = True
+            else:
+                _write(p, table.bits[slot])
+                self.hits += 1
+        
+        # Parse the missing SMILES once: look up their canonical form and compute the fingerprints that are really missing
+        worker = partial(_smiles_chunk_to_fps, fp_type=fp_type, nbits=nbits, radius=radius, canonical=keys is None)
+        chunks = _chunked((smiles[p] for p in missing), chunk_size)
+        missing = iter(missing)
+        for fps, invalid_pos, canonical_smiles in _map_chunks(worker, chunks, n_jobs):
+            chunk = [next(missing) for _ in range(len(fps) + len(invalid_pos))]
+            for j in invalid_pos:
+                invalid[chunk[j]] = True
+                table.add(lookup_keys[chunk[j]])
+            if not fps:
+                continue
+            bits, _ = pack_fingerprints(fps)
+            valid_pos = [p for p in chunk if not invalid[p]]
+            for k, p in enumerate(valid_pos):
+                key = lookup_keys[p] if keys is not None else canonical_smiles[k]
+                slot = table.lookup(key)
+                if slot is not None and slot >= 0:
+                    _write(p, table.bits[slot])
+                    self.hits += 1
+                else:
+                    _write(p, bits[k])
+                    slot = table.add(key, bits[k])
+                    self.misses += 1
+                table.alias(lookup_keys[p], slot)
+        table.flush()
+        
+        if out is None:
+            out = np.zeros((n, 0 if table.bits is None else table.bits.shape[1]), dtype=np.uint8)
+        out = out[~invalid]
+        return out, popcount(out), np.flatnonzero(invalid)
+    
+    def num_bits(self, fp_type:str='rdkit', nbits:int=2048, radius:int=2):
+        "Number of bits of the stored fingerprints (e.g. 167 for MACCS keys), or None if none are stored yet"
+        return self._table(fp_type, nbits, radius).nbits
+    
+    @property
+    def hit_rate(self):
+        "Fraction of fingerprints read from the store"
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.
+    
+    def flush(self):
+        "Write the indices and fingerprints to disk"
+        for table in self._tables.values():
+            table.flush()
+            
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *args):
+        self.flush()
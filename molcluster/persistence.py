@@ -0,0 +1,117 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../notebooks/persistence.ipynb.
+
+# %% auto 0
+__all__ = ['FORMAT_VERSION', 'save_model', 'load_model']
+
+# %% ../notebooks/persistence.ipynb 3
+import importlib
+import json
+import numbers
+from pathlib import Path
+
+import numpy as np
+
+from . import __version__
+from .typing_basics import *
+from .fingerprints import FingerprintMatrix
+
+# %% ../notebooks/persistence.ipynb 5
+FORMAT_VERSION = 1
+
+def _is_json(value):
+    "Whether `value` survives a JSON round trip unchanged"
+    try:
+        return json.loads(json.dumps(value)) == value
+    except (TypeError, ValueError):
+        return False
+
+def _is_numeric_list(value):
+    return isinstance(value, list) and len(value) > 0 and all(isinstance(v, numbers.Real) and not isinstance(v, bool) for v in value)
+
+def save_model(model, path, state:dict=None, exclude:List=('dataset',)):
+    
+    """Save the fitted state of `model` to the directory `path`.
+    
+    Each attribute of `model` is stored in the most compact format that fits it: numeric arrays and lists (labels,
+    centroids, embeddings) as `.npy` files, `FingerprintMatrix` attributes (Butina centroid fingerprints) as packed
+    `.npy` files, small values as JSON in `model.json` and everything else (the fitted sklearn, hdbscan or UMAP
+    estimator) in a single joblib file, whose arrays are stored uncompressed so that they can be memory-mapped.
+    
+    Arguments:
+    
+        model : object
+            A fitted clusterer or transform
+            
+        path : str or Path
+            Directory to write to. It is created if needed and existing files are overwritten.
+            
+        state : dict, optional
+            The attributes to save; defaults to `vars(model)`
+            
+        exclude : list, optional (default=('dataset',))
+            Attributes that are not saved. The training data is left out so that the model stays small.
+    
+    """
+    
+    import joblib
+
+    path = Path(path)
+    (path/'arrays').mkdir(parents=True, exist_ok=True)
+    meta = {'format_version': FORMAT_VERSION, 'molcluster_version': __version__,
+            'class': f'{type(model).__module__}.{type(model).__qualname__}',
+            'attributes': {}, 'arrays': [], 'lists': [], 'fingerprint_matrices': [], 'objects': []}
+    objects = {}
+    for name, value in (vars(model) if state is None else state).items():
+        if name in exclude:
+            continue
+        if isinstance(value, FingerprintMatrix):
+            value.save(path/'fingerprints'/name)
+            meta['fingerprint_matrices'].append(name)
+        elif isinstance(value, np.ndarray) and value.dtype != object:
+            np.save(path/'arrays'/f'{name}.npy', value)
+            meta['arrays'].append(name)
+        elif _is_numeric_list(value):
+            np.save(path/'arrays'/f'{name}.npy', np.asarray(value))
+            meta['lists'].append(name)
+        elif _is_json(value):
+            meta['attributes'][name] = value
+        else:
+            objects[name] = value
+            meta['objects'].append(name)
+    if objects:
+        joblib.dump(objects, path/'objects.joblib')
+    (path/'model.json').write_text(json.dumps(meta, indent=2))
+
+def load_model(path, mmap_mode:str='r'):
+    
+    """Load a model saved with `save_model`.
+    
+    Arrays are memory-mapped by default (`mmap_mode='r'`), so loading takes about the same time whatever the size of the
+    model and only the pages that are used are read. Use `mmap_mode=None` to read everything into memory. The loaded
+    model has `dataset=None`.
+    
+    """
+    
+    import joblib
+
+    path = Path(path)
+    meta = json.loads((path/'model.json').read_text())
+    if meta['format_version'] > FORMAT_VERSION:
+        raise ValueError(f"{path} was saved in format version {meta['format_version']} by molcluster {meta['molcluster_version']}, "
+                         f"this version of molcluster reads up to version {FORMAT_VERSION}")
+    module, _, name = meta['class'].rpartition('.')
+    cls = getattr(importlib.import_module(module), name)
+    state = dict(meta['attributes'])
+    for name in meta['arrays']:
+        state[name] = np.load(path/'arrays'/f'{name}.npy', mmap_mode=mmap_mode)
+    for name in meta['lists']:
+        state[name] = np.load(path/'arrays'/f'{name}.npy').tolist()
+    for name in meta['fingerprint_matrices']:
+        state[name] = FingerprintMatrix.load(path/'fingerprints'/name, mmap_mode=mmap_mode)
+    if meta['objects']:
+        state.update(joblib.load(path/'objects.joblib', mmap_mode=mmap_mode))
+    
+    model = cls.__new__(cls)
+    model.__dict__.update(state)
+    model.dataset = None
+    return model
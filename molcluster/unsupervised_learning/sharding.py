@@ -0,0 +1,390 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../../notebooks/sharding.ipynb.
+
+# %% auto 0
+__all__ = ['scaffold_keys', 'fingerprint_buckets', 'make_shards', 'ShardedClustering']
+
+# %% ../../notebooks/sharding.ipynb 4
+import numpy as np
+from functools import partial
+from typing import Callable
+from threadpoolctl import threadpool_limits
+
+from ..typing_basics import *
+from ..chem_basics import Chem, MurckoScaffold
+from ..data import load_array
+from ..fingerprints import FingerprintMatrix, smiles_to_fps, featurize, _chunked, _map_chunks, _smiles_column, _effective_n_jobs
+from .similarity import tanimoto_block, packed_tanimoto_neighbours
+from .clustering import BaseClustering, ButinaClustering, LeaderClustering
+from .validation import _Points, _clustered
+
+# %% ../../notebooks/sharding.ipynb 5
+def _scaffold_chunk(smiles:List, generic:bool=True):
+    keys = []
+    for smi in smiles:
+        mol = Chem.MolFromSmiles(smi) if isinstance(smi, str) else None
+        if mol is None:
+            keys.append(None)
+            continue
+        scaffold = MurckoScaffold.GetScaffoldForMol(mol)
+        if generic:
+            scaffold = MurckoScaffold.MakeScaffoldGeneric(scaffold)
+        keys.append(Chem.MolToSmiles(scaffold))
+    return keys
+
+def scaffold_keys(smiles:List, generic:bool=True, n_jobs:int=1, chunk_size:int=10000):
+    
+    """Murcko scaffold SMILES of each molecule, to group molecules by chemical series (see `make_shards`).
+    
+    Arguments:
+    
+        smiles : list
+            SMILES of the molecules
+            
+        generic : bool, optional (default=True)
+            Use the generic scaffold (all atoms carbon, all bonds single), so that close analogues share a key.
+            
+        n_jobs : int, optional (default=1)
+            Number of processes used to parse the SMILES
+            
+        chunk_size : int, optional (default=10000)
+            Number of SMILES per task
+            
+    Returns:
+    
+        keys : np.array
+            Scaffold SMILES (object array). Acyclic molecules get '' and SMILES that could not be parsed get None.
+    
+    """
+    
+    chunks = _map_chunks(partial(_scaffold_chunk, generic=generic), _chunked(smiles, chunk_size), n_jobs)
+    return np.array([key for chunk in chunks for key in chunk], dtype=object)
+
+def fingerprint_buckets(X, n_buckets:int, random_state:int=None, block_size:int=1024):
+    
+    """Coarse fingerprint bucket of each molecule: the most similar (Tanimoto) of `n_buckets` random pivot molecules.
+    
+    The pivots are drawn from the dataset, so dense regions of chemical space get more buckets and the buckets are
+    roughly balanced. The cost is `len(X) * n_buckets` similarities.
+    
+    Arguments:
+    
+        X : FingerprintMatrix or array
+            Fingerprints, or a binary array
+            
+        n_buckets : int
+            Number of pivots
+            
+        random_state : int, optional (default=None)
+            Seed for the choice of the pivots
+            
+        block_size : int, optional (default=1024)
+            Number of molecules compared to the pivots at a time
+            
+    Returns:
+    
+        keys : np.array
+            Index of the bucket of each molecule
+    
+    """
+    
+    fpm = X if isinstance(X, FingerprintMatrix) else FingerprintMatrix.from_array(X)
+    rng = np.random.default_rng(random_state)
+    pivots = fpm[np.sort(rng.choice(len(fpm), size=min(n_buckets, len(fpm)), replace=False))]
+    keys = np.empty(len(fpm), dtype=np.int64)
+    for start in range(0, len(fpm), block_size):
+        stop = min(start + block_size, len(fpm))
+        sims = tanimoto_block(fpm.bits[start:stop], fpm.counts[start:stop], pivots.bits, pivots.counts)
+        keys[start:stop] = sims.argmax(axis=1)
+    return keys
+
+def make_shards(keys:ArrayLike, max_shard_size:int=50000):
+    
+    """Split the molecules into shards that never separate two molecules with the same key.
+    
+    The groups of molecules that share a key are packed, largest first, into shards of at most `max_shard_size` molecules.
+    A group larger than `max_shard_size` gets a shard of its own.
+    
+    Arguments:
+    
+        keys : array
+            Key of each molecule, e.g. from `scaffold_keys` or `fingerprint_buckets`. None is a key like any other.
+            
+        max_shard_size : int, optional (default=50000)
+            Maximum number of molecules per shard
+            
+    Returns:
+    
+        shards : list
+            Sorted indices of the molecules of each shard, largest shard first
+    
+    """
+    
+    import pandas as pd
+    
+    codes, _ = pd.factorize(pd.Series(np.asarray(keys, dtype=object)), use_na_sentinel=False)
+    sizes = np.bincount(codes)
+    group_shard = np.empty(len(sizes), dtype=np.int64)
+    shard, filled = 0, 0
+    for group in np.argsort(-sizes, kind='stable'):
+        if filled and filled + sizes[group] > max_shard_size:
+            shard, filled = shard + 1, 0
+        group_shard[group] = shard
+        filled += sizes[group]
+    mol_shard = group_shard[codes]
+    order = np.argsort(mol_shard, kind='stable')
+    shards = np.split(order, np.cumsum(np.bincount(mol_shard))[:-1]) if len(order) else []
+    return sorted(shards, key=len, reverse=True)
+
+# %% ../../notebooks/sharding.ipynb 10
+def _take(dataset, idx:ArrayLike):
+    "The molecules `idx` of `dataset`"
+    if isinstance(dataset, FingerprintMatrix):
+        return dataset[idx]
+    if hasattr(dataset, 'iloc'):
+        return dataset.iloc[idx]
+    if hasattr(dataset, 'shape'):
+        return np.asarray(dataset[idx])
+    return [dataset[i] for i in idx]
+
+def _medoids(data, labels:ArrayLike, max_members:int=1000, block_size:int=1024):
+    "Local index of the medoid of each cluster, estimated against at most `max_members` random members"
+    points = _Points(data, 'tanimoto') if isinstance(data, FingerprintMatrix) else _Points(np.asarray(data, dtype=np.float64), 'euclidean')
+    rng = np.random.default_rng(0)
+    idx, codes, _ = _clustered(labels)
+    medoids = []
+    for members in np.split(idx, np.flatnonzero(np.diff(codes)) + 1) if len(idx) else []:
+        sample = members if len(members) <= max_members else rng.choice(members, max_members, replace=False)
+        sums = np.concatenate([points.distances(members[start:start+block_size], sample).sum(axis=1)
+                               for start in range(0, len(members), block_size)])
+        medoids.append(members[sums.argmin()])
+    return np.array(medoids, dtype=np.int64)
+
+def _cluster_shard(clusterer:type, init_kwargs:dict, cluster_kwargs:dict, data, representatives:bool):
+    "Labels of one shard, renumbered from 0 (noise stays -1), and the local index of a representative of each cluster"
+    model = clusterer(data, **init_kwargs)
+    labels = np.asarray(model.cluster(**cluster_kwargs))
+    uniques, labels = np.unique(labels, return_inverse=True)
+    labels = labels - np.count_nonzero(uniques < 0)
+    if not representatives:
+        return labels, None
+    if isinstance(model, (ButinaClustering, LeaderClustering)):
+        return labels, np.asarray(model.centroids, dtype=np.int64)
+    return labels, _medoids(data, labels)
+
+def _init_shard_worker():
+    # one thread per worker, the parallelism comes from the processes
+    threadpool_limits(1)
+
+def _map_shards(func:Callable, tasks:Iterator, n_jobs:int=1):
+    "`func(*task)` for each task, in order, optionally in a spawned process pool with at most `2 * n_jobs` tasks in flight"
+    n_jobs = _effective_n_jobs(n_jobs)
+    if n_jobs == 1:
+        yield from (func(*task) for task in tasks)
+        return
+    from collections import deque
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import get_context
+    with ProcessPoolExecutor(max_workers=n_jobs, mp_context=get_context('spawn'), initializer=_init_shard_worker) as pool:
+        pending = deque()
+        for task in tasks:
+            pending.append(pool.submit(func, *task))
+            if len(pending) >= 2 * n_jobs:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+# %% ../../notebooks/sharding.ipynb 11
+class ShardedClustering(BaseClustering):
+    
+    """Cluster a large dataset as independent shards of related molecules, in parallel, with any of the clusterers.
+    
+    The molecules are grouped by a key (generic Murcko scaffold or coarse fingerprint bucket), the groups are packed into
+    shards of at most `max_shard_size` molecules (see `make_shards`) and each shard is clustered on its own, in a process
+    pool. Pairwise methods (Butina, hierarchical, HDBSCAN with Tanimoto) then cost about `n * max_shard_size` time and
+    `max_shard_size**2` memory per process instead of `n**2`. Molecules from different shards only end up in the same
+    cluster if the clusters are merged afterwards (`merge_cutoff`, `merge_distance`).
+    
+    Arguments:
+    
+        dataset : FingerprintMatrix, array, DataFrame or list
+            The data of the clusterer, e.g. a list of SMILES for `ButinaClustering`
+            
+        clusterer : type
+            The clusterer run on each shard, e.g. `HDBSCANClustering`
+            
+        smiles : list, optional (default=None)
+            SMILES of the molecules, for `shard_by='scaffold'` when `dataset` is not a list of SMILES
+            
+        **kwargs :
+            Passed to `clusterer` with the data of each shard, e.g. `fp_type` for `ButinaClustering`
+            
+    Attributes:
+    
+        shards : list
+            Indices of the molecules of each shard
+            
+        representatives : np.array
+            Index of one molecule per cluster before the cross-shard merge: the centroid (leader) for Butina and leader
+            clustering, the medoid (against at most 1000 members) otherwise. Only set when clusters are merged.
+    
+    """
+    
+    def __init__(self, dataset, clusterer:type, smiles:List=None, **kwargs):
+        self.dataset = dataset
+        self.shard_clusterer = clusterer
+        self.smiles = smiles
+        self.clusterer_kwargs = kwargs
+        
+    @classmethod
+    def from_smiles(cls, smiles, clusterer:type, fp_type:str='rdkit', nbits:int=2048, radius:int=2, dense:bool=False,
+                    column:str=None, n_jobs:int=1, **kwargs):
+        
+        """Create the sharded clusterer from SMILES, or a DataFrame column.
+        
+        Butina and leader clustering keep the SMILES, with `fp_type`, `nbits` and `radius` as the fingerprint defaults of
+        the shards, the fingerprint shard keys and the merge. For the other clusterers, the SMILES are featurized with
+        `molcluster.fingerprints.featurize`, as in `BaseClustering.from_smiles`, and kept for `shard_by='scaffold'`.
+        `kwargs` are passed to `featurize`.
+        
+        """
+        
+        smiles = list(_smiles_column(smiles, column))
+        if issubclass(clusterer, (ButinaClustering, LeaderClustering)):
+            unused = [*(['dense'] if dense else []), *(['n_jobs'] if n_jobs != 1 else []), *kwargs]
+            if unused:
+                raise TypeError(f"ShardedClustering.from_smiles got arguments that do not apply to {clusterer.__name__}, "
+                                f"which keeps the SMILES: {', '.join(unused)}. Pass n_jobs to `cluster`.")
+            return cls(smiles, clusterer, fp_type=fp_type, nbits=nbits, radius=radius)
+        X, invalid_idx = featurize(smiles, fp_type, nbits, radius, dense=dense, n_jobs=n_jobs, **kwargs)
+        model = cls(X, clusterer, smiles=np.delete(np.array(smiles, dtype=object), invalid_idx))
+        model.invalid_idx = invalid_idx
+        return model
+        
+    def cluster(self, shard_by='scaffold', max_shard_size:int=50000, merge_cutoff:float=None, merge_distance:float=None,
+                n_jobs:int=1, random_state:int=None, **kwargs):
+        
+        """Cluster each shard and combine the labels
+        
+        Arguments:
+        
+            shard_by : str or array, optional (default='scaffold')
+                'scaffold' groups the molecules by generic Murcko scaffold (see `scaffold_keys`), 'fingerprint' by the most
+                similar of `2 * len(dataset) // max_shard_size + 1` random pivots (see `fingerprint_buckets`). An array gives
+                the key of each molecule.
+                
+            max_shard_size : int, optional (default=50000)
+                Maximum number of molecules per shard, unless they share a key
+                
+            merge_cutoff : float, optional (default=None)
+                Merge the clusters of different shards whose representatives have a Tanimoto similarity >= `merge_cutoff`.
+                Merges are transitive. For `FingerprintMatrix` and SMILES datasets.
+                
+            merge_distance : float, optional (default=None)
+                Same as `merge_cutoff` for feature datasets: merge the clusters whose representatives are at a Euclidean
+                distance <= `merge_distance`.
+                
+            n_jobs : int, optional (default=1)
+                Number of shards clustered at once, each in its own process with one thread. Also used for the keys and the merge.
+                
+            random_state : int, optional (default=None)
+                Seed for the pivots of `shard_by='fingerprint'`
+                
+            **kwargs :
+                Passed to the `cluster` method of each shard, e.g. `min_cluster_size` or `sim_cutoff`. They apply to each
+                shard: with `KMeansClustering`, `n_clusters` is the number of clusters per shard.
+                
+        Returns:
+        
+            labels : list
+                Clustering labels. Noise and SMILES that could not be parsed keep the label -1.
+        
+        """
+        
+        if merge_cutoff is not None and merge_distance is not None:
+            raise ValueError("Pass only one of merge_cutoff and merge_distance")
+        merge = merge_cutoff is not None or merge_distance is not None
+        init_kwargs, kwargs = self._shard_kwargs(kwargs)
+        self.dataset = load_array(self.dataset)
+        keys = self._shard_keys(shard_by, max_shard_size, n_jobs, random_state, kwargs)
+        self.shards = make_shards(keys, max_shard_size)
+        tasks = ((self.shard_clusterer, init_kwargs, kwargs, _take(self.dataset, idx), merge) for idx in self.shards)
+        labels = np.full(len(keys), -1, dtype=np.int64)
+        representatives, shard_of = [np.empty(0, dtype=np.int64)], [np.empty(0, dtype=np.int64)]
+        for shard, (idx, (shard_labels, shard_reps)) in enumerate(zip(self.shards, _map_shards(_cluster_shard, tasks, n_jobs))):
+            offset = labels.max(initial=-1) + 1
+            labels[idx[shard_labels >= 0]] = shard_labels[shard_labels >= 0] + offset
+            if merge:
+                representatives.append(idx[shard_reps])
+                shard_of.append(np.full(len(shard_reps), shard))
+        self._clusterer = None
+        if merge:
+            self.representatives = np.concatenate(representatives)
+            labels = self._merge(labels, np.concatenate(shard_of), merge_cutoff, merge_distance, n_jobs, kwargs)
+        self._labels = labels.tolist()
+        return self._labels
+    
+    def _shard_kwargs(self, kwargs:dict):
+        "Constructor and `cluster` arguments of the shard clusterers: `nbits` and `radius` given at creation are `cluster` defaults"
+        init_kwargs = {k: v for k, v in self.clusterer_kwargs.items() if k not in ('nbits', 'radius')}
+        fp_kwargs = {k: v for k, v in self.clusterer_kwargs.items() if k in ('nbits', 'radius')}
+        return init_kwargs, {**fp_kwargs, **kwargs}
+    
+    def _shard_keys(self, shard_by, max_shard_size:int, n_jobs:int, random_state:int, kwargs:dict):
+        "Key of each molecule for `make_shards`"
+        if not isinstance(shard_by, str):
+            if len(shard_by) != len(self.dataset):
+                raise ValueError(f"Got {len(shard_by)} keys for {len(self.dataset)} molecules")
+            return shard_by
+        if shard_by == 'scaffold':
+            smiles = self.dataset if self.smiles is None and self._smiles_dataset() else self.smiles
+            if smiles is None:
+                raise ValueError("shard_by='scaffold' needs the SMILES of the molecules, pass them as `smiles`")
+            return scaffold_keys(smiles, n_jobs=n_jobs)
+        if shard_by == 'fingerprint':
+            n_buckets = 2 * len(self.dataset) // max_shard_size + 1
+            if isinstance(self.dataset, FingerprintMatrix):
+                return fingerprint_buckets(self.dataset, n_buckets, random_state=random_state)
+            if self._smiles_dataset():
+                fpm, invalid_idx = self._smiles_fps(self.dataset, kwargs, n_jobs)
+                keys = np.full(len(self.dataset), -1, dtype=np.int64)
+                keys[np.setdiff1d(np.arange(len(self.dataset)), invalid_idx)] = fingerprint_buckets(fpm, n_buckets, random_state=random_state)
+                return keys
+            raise ValueError("shard_by='fingerprint' needs a FingerprintMatrix or SMILES dataset")
+        raise ValueError(f"Unknown shard_by '{shard_by}', use 'scaffold', 'fingerprint' or an array of keys")
+    
+    def _smiles_dataset(self):
+        "Whether the dataset is a list of SMILES, turned into fingerprints by the shard clusterer"
+        return issubclass(self.shard_clusterer, (ButinaClustering, LeaderClustering)) and not isinstance(self.dataset, FingerprintMatrix)
+    
+    def _smiles_fps(self, smiles:List, kwargs:dict, n_jobs:int=1):
+        "Fingerprints of `smiles` as computed by the shard clusterer, and the positions of the invalid SMILES"
+        fp_type = self.clusterer_kwargs.get('fp_type', 'rdkit')
+        fp_list, invalid_idx = smiles_to_fps(smiles, fp_type, kwargs.get('nbits', 2048), kwargs.get('radius', 2), n_jobs=n_jobs, progress=False)
+        return FingerprintMatrix.from_fps(fp_list), invalid_idx
+    
+    def _merge(self, labels:np.ndarray, shard_of:np.ndarray, merge_cutoff:float, merge_distance:float, n_jobs:int, kwargs:dict):
+        "Labels after merging the clusters of different shards with close representatives"
+        from scipy.sparse import coo_matrix
+        from scipy.sparse.csgraph import connected_components
+        
+        reps = self.representatives
+        if merge_cutoff is not None:
+            if isinstance(self.dataset, FingerprintMatrix):
+                fpm = self.dataset[reps]
+            elif self._smiles_dataset():
+                fpm, _ = self._smiles_fps([self.dataset[i] for i in reps], kwargs, n_jobs)
+            else:
+                raise ValueError("merge_cutoff needs a FingerprintMatrix or SMILES dataset, use merge_distance for features")
+            graph = packed_tanimoto_neighbours(fpm.bits, fpm.counts, merge_cutoff, n_jobs=n_jobs)
+            rows, cols = np.repeat(np.arange(len(graph)), graph.degree), graph.indices
+        else:
+            from sklearn.neighbors import radius_neighbors_graph
+            graph = radius_neighbors_graph(np.asarray(_take(self.dataset, reps), dtype=np.float64), merge_distance, n_jobs=n_jobs).tocoo()
+            rows, cols = graph.row, graph.col
+        # clusters of the same shard were kept apart by the clusterer
+        cross = shard_of[rows] != shard_of[cols]
+        adjacency = coo_matrix((np.ones(np.count_nonzero(cross)), (rows[cross], cols[cross])), shape=(len(reps), len(reps)))
+        _, merged = connected_components(adjacency, directed=False)
+        clustered = labels >= 0
+        labels[clustered] = merged[labels[clustered]]
+        return labels
@@ -0,0 +1,692 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../../notebooks/similarity.ipynb.
+
+# %% auto 0
+__all__ = ['NeighbourGraph', 'tanimoto_neighbours', 'butina_clusters', 'tanimoto_block', 'tanimoto_matrix', 'tanimoto_distances',
+           'tanimoto_condensed', 'packed_tanimoto_neighbours', 'packed_tanimoto_knn', 'MinHashIndex',
+           'neighbour_recall', 'knn_recall']
+
+# %% ../../notebooks/similarity.ipynb 3
+import warnings
+
+import numpy as np
+from rdkit import DataStructs
+
+from ..typing_basics import *
+from ..fingerprints import pack_array, pack_fingerprints, popcount, FingerprintMatrix, _effective_n_jobs
+
+# %% ../../notebooks/similarity.ipynb 5
+class NeighbourGraph:
+    
+    """Sparse, symmetric neighbour graph stored in compressed sparse row (CSR) format.
+    
+    The neighbours of molecule `i` are `indices[indptr[i]:indptr[i+1]]`, sorted by index, and `data` holds the corresponding similarities.
+    Self-loops are not stored.
+    
+    Attributes:
+    
+        indptr : numpy.array
+            Row pointers with shape (n+1,).
+            
+        indices : numpy.array
+            Neighbour indices (int32) with shape (n_edges,).
+            
+        data : numpy.array
+            Similarities (float64) with shape (n_edges,).
+    
+    """
+    
+    def __init__(self, indptr:ArrayLike, indices:ArrayLike, data:ArrayLike=None):
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.data = None if data is None else np.asarray(data, dtype=np.float64)
+        
+    def __len__(self):
+        return len(self.indptr) - 1
+    
+    @property
+    def degree(self):
+        "Number of neighbours of each molecule"
+        return np.diff(self.indptr)
+    
+    def neighbours(self, i:int):
+        "Indices of the neighbours of molecule `i`"
+        return self.indices[self.indptr[i]:self.indptr[i+1]]
+    
+    def filter(self, sim_cutoff:float):
+        "A new graph with only the edges with similarity >= `sim_cutoff`"
+        keep = (1 - self.data) <= 1.0 - sim_cutoff
+        rows = np.repeat(np.arange(len(self)), self.degree)
+        indptr = np.zeros_like(self.indptr)
+        np.cumsum(np.bincount(rows[keep], minlength=len(self)), out=indptr[1:])
+        return NeighbourGraph(indptr, self.indices[keep], self.data[keep])
+    
+    @classmethod
+    def from_lower_triangle(cls, n:int, rows:ArrayLike, cols:ArrayLike, data:ArrayLike=None):
+        
+        """Build a symmetric graph with `n` nodes from the edges (rows[k], cols[k]), where cols[k] < rows[k].
+        
+        """
+        
+        rows = np.asarray(rows, dtype=np.int32)
+        cols = np.asarray(cols, dtype=np.int32)
+        src = np.concatenate([rows, cols])
+        dst = np.concatenate([cols, rows])
+        order = np.lexsort((dst, src))
+        indptr = np.zeros(n+1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+        if data is not None:
+            data = np.concatenate([data, data])[order]
+        return cls(indptr, dst[order], data)
+
+# %% ../../notebooks/similarity.ipynb 7
+def _triangular_blocks(n:int, n_blocks:int):
+    "Split rows 1..n-1 into `n_blocks` contiguous blocks with roughly the same number of lower-triangle pairs"
+    bounds = np.unique(np.round(n * np.sqrt(np.arange(n_blocks + 1) / n_blocks)).astype(int))
+    bounds[0], bounds[-1] = 1, n
+    return [(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:]) if a < b]
+
+def _neighbour_rows(fp_list, start:int, stop:int, dist_cutoff:float, block_size:int=1024):
+    "Neighbours (j < i) within `dist_cutoff` for rows `start <= i < stop`"
+    rows, cols, sims = [], [], []
+    buf_rows, buf_cols, buf_sims = [], [], []
+    for i in range(start, stop):
+        s = np.array(DataStructs.BulkTanimotoSimilarity(fp_list[i], fp_list[:i]))
+        j = np.flatnonzero((1 - s) <= dist_cutoff)
+        buf_rows.append(np.full(len(j), i, dtype=np.int32))
+        buf_cols.append(j.astype(np.int32))
+        buf_sims.append(s[j])
+        if len(buf_rows) == block_size or i == stop - 1:
+            rows.append(np.concatenate(buf_rows))
+            cols.append(np.concatenate(buf_cols))
+            sims.append(np.concatenate(buf_sims))
+            buf_rows, buf_cols, buf_sims = [], [], []
+    if not rows:
+        return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32), np.zeros(0)
+    return np.concatenate(rows), np.concatenate(cols), np.concatenate(sims)
+
+_worker_fps = None
+
+def _init_worker(fp_list):
+    global _worker_fps
+    _worker_fps = fp_list
+    
+def _worker_neighbour_rows(start:int, stop:int, dist_cutoff:float):
+    return _neighbour_rows(_worker_fps, start, stop, dist_cutoff)
+
+def tanimoto_neighbours(fp_list:List, sim_cutoff:float, n_jobs:int=1, block_size:int=1024):
+    
+    """Find all pairs of fingerprints with Tanimoto similarity >= `sim_cutoff`.
+    
+    Similarities are computed one row at a time with `BulkTanimotoSimilarity` and only the neighbours within the cutoff are kept,
+    so memory grows with the number of neighbours instead of the number of pairs.
+    
+    Arguments:
+    
+        fp_list : list
+            A list of RDKit fingerprints.
+            
+        sim_cutoff : float
+            The minimum Tanimoto similarity for two molecules to be neighbours.
+            
+        n_jobs : int, optional (default=1)
+            Number of processes. The rows are split into blocks with the same number of pairs, which are processed in a
+            process pool. Each worker receives a pickled copy of the fingerprints once. The result is the same as with `n_jobs=1`.
+            
+        block_size : int, optional (default=1024)
+            Number of rows whose neighbours are buffered before being merged into compact arrays.
+            
+    Returns:
+    
+        graph : NeighbourGraph
+    
+    """
+    
+    dist_cutoff = 1.0 - sim_cutoff
+    nfps = len(fp_list)
+    if nfps < 2:
+        return NeighbourGraph(np.zeros(nfps+1), np.zeros(0), np.zeros(0))
+    
+    n_jobs = _effective_n_jobs(n_jobs)
+    if n_jobs == 1:
+        rows, cols, sims = _neighbour_rows(fp_list, 1, nfps, dist_cutoff, block_size)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        # More blocks than workers so that the last blocks do not leave processes idle
+        blocks = _triangular_blocks(nfps, 4 * n_jobs)
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=(list(fp_list),)) as pool:
+            futures = [pool.submit(_worker_neighbour_rows, start, stop, dist_cutoff) for start, stop in blocks]
+            results = [f.result() for f in futures]
+        rows, cols, sims = (np.concatenate(x) for x in zip(*results))
+            
+    return NeighbourGraph.from_lower_triangle(nfps, rows, cols, sims)
+
+# %% ../../notebooks/similarity.ipynb 9
+def butina_clusters(graph:NeighbourGraph):
+    
+    """Run the Butina centroid-selection pass on a neighbour graph.
+    
+    Molecules are visited by decreasing number of neighbours (ties broken by decreasing index). Each unassigned molecule becomes
+    the centroid of a new cluster that takes all of its unassigned neighbours. This gives the same clusters as `rdkit.ML.Cluster.Butina.ClusterData`.
+    
+    Arguments:
+    
+        graph : NeighbourGraph
+        
+    Returns:
+    
+        labels : np.array
+            Clustering labels
+            
+        centroids : np.array
+            Index of the centroid of each cluster
+    
+    """
+    
+    n = len(graph)
+    degree = graph.degree
+    order = np.lexsort((np.arange(n), degree))[::-1]
+    indptr, indices = graph.indptr, graph.indices
+    labels = np.full(n, -1, dtype=np.int64)
+    centroids = []
+    
+    n_linked = np.count_nonzero(degree)
+    for idx in order[:n_linked]:
+        if labels[idx] >= 0:
+            continue
+        nbrs = indices[indptr[idx]:indptr[idx+1]]
+        labels[idx] = len(centroids)
+        labels[nbrs[labels[nbrs] < 0]] = len(centroids)
+        centroids.append(idx)
+        
+    # Molecules without neighbours are singletons
+    singletons = order[n_linked:]
+    singletons = singletons[labels[singletons] < 0]
+    labels[singletons] = np.arange(len(centroids), len(centroids) + len(singletons))
+    centroids = np.concatenate([np.array(centroids, dtype=np.int64), singletons])
+    return labels, centroids
+
+# %% ../../notebooks/similarity.ipynb 14
+def tanimoto_block(a_bits:ArrayLike, a_counts:ArrayLike, b_bits:ArrayLike, b_counts:ArrayLike):
+    
+    """Tanimoto similarities between two blocks of packed fingerprints (see `molcluster.fingerprints.pack_fingerprints`).
+    
+    The intersection is the popcount of the bitwise AND, computed one 64-bit word at a time, and the similarity is
+    `intersection / (a_count + b_count - intersection)`, as in RDKit.
+    
+    Returns:
+    
+        sims : np.array
+            Similarities with shape (len(a_bits), len(b_bits)).
+    
+    """
+    
+    # One contiguous row per 64-bit word
+    a = np.ascontiguousarray(np.ascontiguousarray(a_bits).view(np.uint64).T)
+    b = np.ascontiguousarray(np.ascontiguousarray(b_bits).view(np.uint64).T)
+    shape = (a.shape[1], b.shape[1])
+    inter = np.zeros(shape, dtype=np.uint16 if len(a) * 64 < 2**16 else np.int64)
+    word, word_count = np.empty(shape, dtype=np.uint64), np.empty(shape, dtype=np.uint8)
+    for w in range(len(a)):
+        np.bitwise_and(a[w][:, None], b[w][None, :], out=word)
+        if hasattr(np, 'bitwise_count'):
+            np.bitwise_count(word, out=word_count)
+        else:
+            word_count[:] = popcount(word[..., None])
+        inter += word_count
+    inter = inter.astype(np.int64)
+    union = np.asarray(a_counts)[:, None] + np.asarray(b_counts)[None, :] - inter
+    sims = np.zeros(inter.shape)
+    np.divide(inter, union, out=sims, where=union > 0)
+    return sims
+
+def tanimoto_matrix(bits:ArrayLike, counts:ArrayLike, other_bits:ArrayLike=None, other_counts:ArrayLike=None,
+                    block_size:int=1024, dtype=np.float64):
+    
+    """Tanimoto similarity matrix of packed fingerprints, computed in tiles of `block_size` x `block_size`.
+    
+    Arguments:
+    
+        bits, counts : np.array
+            Packed fingerprints and their popcounts.
+            
+        other_bits, other_counts : np.array, optional (default=None)
+            Fingerprints to compare against. If None, the similarities between all pairs in `bits` are computed.
+            
+        block_size : int, optional (default=1024)
+            Tile size. The temporary memory is about 8 * block_size**2 bytes.
+            
+        dtype : optional (default=np.float64)
+            Data type of the result, e.g. `np.float32` to halve the memory of large matrices.
+    
+    Returns:
+    
+        sims : np.array
+            Similarities with shape (len(bits), len(other_bits)).
+    
+    """
+    
+    symmetric = other_bits is None
+    if symmetric:
+        other_bits, other_counts = bits, counts
+    sims = np.empty((len(bits), len(other_bits)), dtype=dtype)
+    for i in range(0, len(bits), block_size):
+        for j in range(0, len(other_bits), block_size):
+            if symmetric and j > i:
+                break
+            tile = tanimoto_block(bits[i:i+block_size], counts[i:i+block_size],
+                                  other_bits[j:j+block_size], other_counts[j:j+block_size])
+            sims[i:i+block_size, j:j+block_size] = tile
+            if symmetric:
+                sims[j:j+block_size, i:i+block_size] = tile.T
+    return sims
+
+def tanimoto_distances(X:ArrayLike, block_size:int=1024, dtype=np.float64):
+    "Tanimoto distance matrix (1 - similarity) of a dense binary matrix or `FingerprintMatrix` `X`, e.g. to use with `metric='precomputed'`"
+    bits, counts = (X.bits, X.counts) if isinstance(X, FingerprintMatrix) else pack_array(X)
+    dists = tanimoto_matrix(bits, counts, block_size=block_size, dtype=dtype)
+    np.subtract(1, dists, out=dists)
+    return dists
+
+def tanimoto_condensed(X:ArrayLike, block_size:int=1024, dtype=np.float64):
+    
+    """Condensed Tanimoto distance matrix of a dense binary matrix or `FingerprintMatrix` `X`, in the order of `scipy.spatial.distance.pdist`.
+    
+    Only the upper triangle is stored, i.e. n * (n - 1) / 2 distances instead of n**2, so this can be passed to
+    `scipy.cluster.hierarchy.linkage` with half the memory of `tanimoto_distances`. The rows are computed in blocks of
+    about `block_size**2` pairs.
+    
+    Returns:
+    
+        dists : np.array
+            Distances with shape (n * (n - 1) // 2,).
+    
+    """
+    
+    bits, counts = (X.bits, X.counts) if isinstance(X, FingerprintMatrix) else pack_array(X)
+    n = len(bits)
+    dists = np.empty(n * (n - 1) // 2, dtype=dtype)
+    rows_per_block = max(1, block_size**2 // max(n, 1))
+    offset = 0
+    for start in range(0, n, rows_per_block):
+        stop = min(start + rows_per_block, n)
+        sims = tanimoto_block(bits[start:stop], counts[start:stop], bits[start:], counts[start:])
+        for i in range(start, stop):
+            row = sims[i - start, i - start + 1:]
+            dists[offset:offset + len(row)] = 1 - row
+            offset += len(row)
+    return dists
+
+# %% ../../notebooks/similarity.ipynb 17
+def _packed_neighbour_rows(bits, counts, start:int, stop:int, dist_cutoff:float, block_size:int):
+    "Neighbours (j < i) within `dist_cutoff` for rows `start <= i < stop`, from packed fingerprints"
+    rows, cols, sims = [], [], []
+    row_idx = np.arange(start, stop)
+    for j in range(0, stop, block_size):
+        s = tanimoto_block(bits[start:stop], counts[start:stop], bits[j:j+block_size], counts[j:j+block_size])
+        keep = (1 - s) <= dist_cutoff
+        keep &= np.arange(j, j + s.shape[1])[None, :] < row_idx[:, None]
+        r, c = np.nonzero(keep)
+        rows.append((r + start).astype(np.int32))
+        cols.append((c + j).astype(np.int32))
+        sims.append(s[r, c])
+    return np.concatenate(rows), np.concatenate(cols), np.concatenate(sims)
+
+def packed_tanimoto_neighbours(bits:ArrayLike, counts:ArrayLike, sim_cutoff:float, n_jobs:int=1, block_size:int=1024):
+    
+    """Find all pairs of packed fingerprints with Tanimoto similarity >= `sim_cutoff`.
+    
+    Same as `tanimoto_neighbours`, but the similarities are computed with the NumPy kernel `tanimoto_block`, in tiles of
+    `block_size` x `block_size`, instead of one RDKit call per row.
+    
+    Arguments:
+    
+        bits, counts : np.array
+            Packed fingerprints and their popcounts (see `molcluster.fingerprints.pack_fingerprints`).
+            
+        sim_cutoff : float
+            The minimum Tanimoto similarity for two molecules to be neighbours.
+            
+        n_jobs : int, optional (default=1)
+            Number of threads. NumPy releases the GIL in the kernel, so the row blocks are processed in a thread pool.
+            
+        block_size : int, optional (default=1024)
+            Tile size. The temporary memory is about 8 * block_size**2 bytes per thread.
+            
+    Returns:
+    
+        graph : NeighbourGraph
+    
+    """
+    
+    dist_cutoff = 1.0 - sim_cutoff
+    n = len(bits)
+    starts = range(0, n, block_size)
+    func = lambda start: _packed_neighbour_rows(bits, counts, start, min(start + block_size, n), dist_cutoff, block_size)
+    n_jobs = _effective_n_jobs(n_jobs)
+    if n_jobs == 1:
+        results = list(map(func, starts))
+    else:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+            results = list(pool.map(func, starts))
+    if not results:
+        return NeighbourGraph(np.zeros(1), np.zeros(0), np.zeros(0))
+    rows, cols, sims = (np.concatenate(x) for x in zip(*results))
+    return NeighbourGraph.from_lower_triangle(n, rows, cols, sims)
+
+# %% ../../notebooks/similarity.ipynb 23
+def _packed_knn_rows(bits, counts, a_bits, a_counts, k:int, block_size:int, exclude:ArrayLike=None):
+    "The `k` fingerprints of `bits` most similar to each query fingerprint of `a_bits`, excluding `exclude[i]` for query `i`"
+    rows = np.full(len(a_bits), -1) if exclude is None else exclude
+    best_sims = np.empty((len(a_bits), 0))
+    best_idx = np.empty((len(a_bits), 0), dtype=np.int64)
+    for j in range(0, len(bits), block_size):
+        s = tanimoto_block(a_bits, a_counts, bits[j:j+block_size], counts[j:j+block_size])
+        cols = np.arange(j, j + s.shape[1])
+        s[cols[None, :] == rows[:, None]] = -1
+        best_sims = np.hstack([best_sims, s])
+        best_idx = np.hstack([best_idx, np.broadcast_to(cols, s.shape)])
+        if best_sims.shape[1] > k:
+            top = np.argpartition(-best_sims, k - 1, axis=1)[:, :k]
+            best_sims = np.take_along_axis(best_sims, top, axis=1)
+            best_idx = np.take_along_axis(best_idx, top, axis=1)
+    order = np.lexsort((best_idx, -best_sims), axis=1) if best_sims.size else best_idx
+    return np.take_along_axis(best_idx, order, axis=1).astype(np.int32), np.take_along_axis(best_sims, order, axis=1)
+
+def packed_tanimoto_knn(bits:ArrayLike, counts:ArrayLike, k:int, n_jobs:int=1, block_size:int=1024,
+                        query_bits:ArrayLike=None, query_counts:ArrayLike=None):
+    
+    """Find the `k` most similar fingerprints of each packed fingerprint (excluding itself), by exact blocked search.
+    
+    Arguments:
+    
+        bits, counts : np.array
+            Packed fingerprints and their popcounts (see `molcluster.fingerprints.pack_fingerprints`).
+            
+        k : int
+            Number of neighbours. It is capped at `len(bits) - 1` (`len(bits)` with query fingerprints).
+            
+        n_jobs : int, optional (default=1)
+            Number of threads.
+            
+        block_size : int, optional (default=1024)
+            Tile size. The temporary memory is about 8 * block_size * (block_size + k) bytes per thread.
+            
+        query_bits, query_counts : np.array, optional (default=None)
+            Find the neighbours in `bits` of these fingerprints instead, e.g. new molecules. No neighbour is excluded.
+            
+    Returns:
+    
+        indices : np.array
+            Indices of the neighbours with shape (n, k), where n is the number of queries, sorted by decreasing similarity
+            (ties by index).
+            
+        sims : np.array
+            Tanimoto similarities of the neighbours with shape (n, k).
+    
+    """
+    
+    if query_bits is None:
+        query_bits, query_counts, k = bits, counts, min(k, len(bits) - 1)
+        exclude = lambda rows: rows
+    else:
+        k = min(k, len(bits))
+        exclude = lambda rows: None
+    n = len(query_bits)
+    def func(start):
+        rows = np.arange(start, min(start + block_size, n))
+        return _packed_knn_rows(bits, counts, query_bits[rows], query_counts[rows], k, block_size, exclude(rows))
+    starts = range(0, n, block_size)
+    n_jobs = _effective_n_jobs(n_jobs)
+    if n_jobs == 1:
+        results = list(map(func, starts))
+    else:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+            results = list(pool.map(func, starts))
+    if not results:
+        return np.zeros((0, max(k, 0)), dtype=np.int32), np.zeros((0, max(k, 0)))
+    indices, sims = (np.vstack(x) for x in zip(*results))
+    return indices, sims
+
+# %% ../../notebooks/similarity.ipynb 27
+def _pair_tanimoto(words, counts, i:ArrayLike, j:ArrayLike, chunk_size:int=2**18):
+    "Tanimoto similarities of the pairs (i[k], j[k]), from fingerprints viewed as uint64 words"
+    sims = np.zeros(len(i))
+    for start in range(0, len(i), chunk_size):
+        a, b = i[start:start+chunk_size], j[start:start+chunk_size]
+        inter = popcount(words[a] & words[b])
+        union = counts[a] + counts[b] - inter
+        np.divide(inter, union, out=sims[start:start+chunk_size], where=union > 0)
+    return sims
+
+def _bucket_pairs(keys:ArrayLike):
+    "All pairs (i, j), i > j, of rows with the same key, encoded as i * n + j"
+    n = len(keys)
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+    group_end = np.repeat(np.r_[starts[1:], n], np.diff(np.r_[starts, n]))
+    pairs = []
+    active = np.flatnonzero(group_end - np.arange(n) > 1)
+    offset = 1
+    while len(active):
+        a, b = order[active], order[active + offset]
+        pairs.append(np.maximum(a, b).astype(np.int64) * n + np.minimum(a, b))
+        offset += 1
+        active = active[group_end[active] - active > offset]
+    return np.concatenate(pairs) if pairs else np.zeros(0, dtype=np.int64)
+
+class MinHashIndex:
+    
+    """Approximate nearest-neighbour index over packed fingerprints, based on MinHash locality-sensitive hashing.
+    
+    Attributes:
+    
+        bits, counts : np.array
+            Packed fingerprints and their popcounts (see `molcluster.fingerprints.pack_fingerprints`).
+            
+        nbits : int
+            Number of bits per fingerprint.
+            
+        signatures : np.array
+            MinHash signatures with shape (n, n_hashes).
+            
+    Methods:
+    
+        query_radius(sim_cutoff:float, recall:float)
+            All pairs with Tanimoto similarity >= `sim_cutoff` (approximately), as a `NeighbourGraph`.
+            
+        query_knn(k:int)
+            The `k` most similar fingerprints of each fingerprint (approximately).
+    
+    """
+    
+    def __init__(self, bits:ArrayLike, counts:ArrayLike, nbits:int=None, n_hashes:int=128, random_state:int=0, block_size:int=4096,
+                 max_gather:int=2**22):
+        
+        """
+        Parameters:
+        
+            bits, counts : np.array
+            
+            nbits : int, optional (default=None)
+                Number of bits per fingerprint, by default `8 * bits.shape[1]`.
+                
+            n_hashes : int, optional (default=128)
+                Length of the signatures. More hashes allow sharper bands (fewer candidates for the same recall), at the
+                cost of 2 * n_hashes bytes per fingerprint and a longer build.
+                
+            random_state : int, optional (default=0)
+            
+            block_size : int, optional (default=4096)
+                Number of fingerprints hashed at a time.
+                
+            max_gather : int, optional (default=2**22)
+                Maximum number of hash values gathered at a time while hashing a block, which bounds the temporary
+                memory to about 2 * max_gather bytes.
+        
+        """
+        
+        self.bits, self.counts = bits, np.asarray(counts)
+        self.nbits = bits.shape[1] * 8 if nbits is None else nbits
+        self.n_hashes = n_hashes
+        rng = np.random.default_rng(random_state)
+        dtype = np.uint16 if self.nbits < 2**16 else np.uint32
+        perms = np.array([rng.permutation(self.nbits) for _ in range(n_hashes)], dtype=dtype)
+        # Empty fingerprints get the value `nbits` everywhere
+        self.signatures = np.full((len(bits), n_hashes), self.nbits, dtype=dtype)
+        for start in range(0, len(bits), block_size):
+            dense = np.unpackbits(bits[start:start+block_size], axis=1, count=self.nbits, bitorder='little')
+            rows, cols = np.nonzero(dense)
+            if len(rows) == 0:
+                continue
+            row_starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+            # Gather the permuted positions of the set bits for a few hashes at a time: all of them at once take
+            # 2 * n_hashes bytes per set bit, about 1 GB for 4096 RDKit fingerprints
+            step = max(1, max_gather // len(cols))
+            for h in range(0, n_hashes, step):
+                self.signatures[start + rows[row_starts], h:h+step] = np.minimum.reduceat(perms[h:h+step, cols], row_starts, axis=1).T
+        self._words = np.ascontiguousarray(bits).view(np.uint64)
+        
+    def __len__(self):
+        return len(self.bits)
+    
+    @classmethod
+    def from_fps(cls, fp_list:List, **kwargs):
+        "Build an index from a list of RDKit `ExplicitBitVect`"
+        bits, counts = pack_fingerprints(fp_list)
+        return cls(bits, counts, fp_list[0].GetNumBits() if len(fp_list) else 0, **kwargs)
+    
+    def band_size(self, sim_cutoff:float, recall:float=0.95):
+        "Largest band size `r` whose probability of finding a pair with similarity `sim_cutoff` is at least `recall`"
+        for r in range(self.n_hashes, 0, -1):
+            if 1 - (1 - sim_cutoff ** r) ** (self.n_hashes // r) >= recall:
+                return r
+        return 1
+    
+    def _band_keys(self, r:int):
+        "Hash of each band of `r` signature values, one array of keys per band"
+        for start in range(0, self.n_hashes - r + 1, r):
+            keys = np.zeros(len(self), dtype=np.uint64)
+            for col in self.signatures[:, start:start+r].T:
+                keys = keys * np.uint64(1000003) ^ col.astype(np.uint64)
+            yield keys
+    
+    def n_candidates(self, r:int):
+        "Number of candidate pairs for band size `r`, counted once per shared band (an upper bound of `len(candidate_pairs(r))`)"
+        total = 0
+        for keys in self._band_keys(r):
+            sizes = np.unique(keys, return_counts=True)[1].astype(np.int64)
+            total += int((sizes * (sizes - 1) // 2).sum())
+        return total
+    
+    def _too_many_candidates(self, r:int, max_candidates:float=None):
+        "Whether the candidates for band size `r` are more than a fraction `max_candidates` of all pairs (never if it is None)"
+        return max_candidates is not None and self.n_candidates(r) > max_candidates * len(self) * (len(self) - 1) / 2
+    
+    def candidate_pairs(self, r:int, max_candidates:float=0.1):
+        
+        """Pairs of rows (i > j) that share at least one band of `r` hash values, encoded as i * n + j.
+        
+        Enumerating the candidates costs more per pair than the exact kernel, so a warning is raised when they are more than
+        a fraction `max_candidates` of all pairs (small `r`, or fingerprints with many bits set). `None` skips the check.
+        
+        """
+        
+        if self._too_many_candidates(r, max_candidates):
+            warnings.warn(f"Bands of {r} hashes make most pairs candidates, which is slower than the exact search: "
+                          "use a larger band size, or `packed_tanimoto_neighbours`")
+        pairs = [np.unique(_bucket_pairs(keys)) for keys in self._band_keys(r)]
+        return np.unique(np.concatenate(pairs)) if pairs else np.zeros(0, dtype=np.int64)
+    
+    def query_radius(self, sim_cutoff:float, recall:float=0.95, r:int=None, max_candidates:float=0.1):
+        
+        """Find the pairs of fingerprints with Tanimoto similarity >= `sim_cutoff`.
+        
+        Arguments:
+        
+            sim_cutoff : float
+            
+            recall : float, optional (default=0.95)
+                Probability of finding a pair with similarity `sim_cutoff`. Pairs with higher similarity are found with
+                higher probability.
+                
+            r : int, optional (default=None)
+                Band size, by default `band_size(sim_cutoff, recall)`.
+                
+            max_candidates : float, optional (default=0.1)
+                If the candidates are more than this fraction of all pairs (low cutoffs, or fingerprints with many bits set
+                such as RDKit ones), the exact `packed_tanimoto_neighbours` is used instead, as it is faster. `None` always
+                uses the index.
+                
+        Returns:
+        
+            graph : NeighbourGraph
+                The same graph as `packed_tanimoto_neighbours`, without the pairs that were not candidates.
+        
+        """
+        
+        r = self.band_size(sim_cutoff, recall) if r is None else r
+        if self._too_many_candidates(r, max_candidates):
+            return packed_tanimoto_neighbours(self.bits, self.counts, sim_cutoff)
+        pairs = self.candidate_pairs(r, max_candidates=None)
+        rows, cols = np.divmod(pairs, len(self))
+        sims = _pair_tanimoto(self._words, self.counts, rows, cols)
+        keep = (1 - sims) <= 1.0 - sim_cutoff
+        return NeighbourGraph.from_lower_triangle(len(self), rows[keep], cols[keep], sims[keep])
+    
+    def query_knn(self, k:int, band_sizes:List=(8, 5), block_size:int=1024, max_candidates:float=0.1):
+        
+        """Find the `k` most similar fingerprints of each fingerprint, excluding itself.
+        
+        Candidates are collected with decreasing band sizes until every fingerprint has at least `k` of them, and the
+        `k` most similar candidates are kept. Fingerprints that still have fewer than `k` candidates (usually isolated
+        molecules) are searched exactly against the whole index. If the candidates of a band size are more than a fraction
+        `max_candidates` of all pairs, the exact `packed_tanimoto_knn` is used instead, as in `query_radius`.
+        
+        Returns:
+        
+            indices, sims : np.array
+                Same format as `packed_tanimoto_knn`.
+        
+        """
+        
+        n = len(self)
+        k = min(k, n - 1)
+        pairs = np.zeros(0, dtype=np.int64)
+        for r in band_sizes:
+            if self._too_many_candidates(r, max_candidates):
+                return packed_tanimoto_knn(self.bits, self.counts, k, block_size=block_size)
+            pairs = np.union1d(pairs, self.candidate_pairs(r, max_candidates=None))
+            n_candidates = np.bincount(np.concatenate(np.divmod(pairs, n)), minlength=n)
+            if (n_candidates >= k).all():
+                break
+        rows, cols = np.divmod(pairs, n)
+        src, dst = np.r_[rows, cols], np.r_[cols, rows]
+        sims = _pair_tanimoto(self._words, self.counts, src, dst)
+        order = np.lexsort((dst, -sims, src))
+        src, dst, sims = src[order], dst[order], sims[order]
+        rank = np.arange(len(src)) - np.searchsorted(src, src)
+        top = rank < k
+        indices = np.zeros((n, k), dtype=np.int32)
+        knn_sims = np.zeros((n, k))
+        indices[src[top], rank[top]] = dst[top]
+        knn_sims[src[top], rank[top]] = sims[top]
+        
+        missing = np.flatnonzero(np.bincount(src, minlength=n) < k)
+        for start in range(0, len(missing), block_size):
+            rows = missing[start:start+block_size]
+            indices[rows], knn_sims[rows] = _packed_knn_rows(self.bits, self.counts, self.bits[rows], self.counts[rows], k, block_size, rows)
+        return indices, knn_sims
+
+def neighbour_recall(approx:NeighbourGraph, exact:NeighbourGraph):
+    "Fraction of the edges of `exact` that are also in `approx`"
+    def edges(g):
+        return np.repeat(np.arange(len(g), dtype=np.int64), g.degree) * len(g) + g.indices
+    exact_edges = edges(exact)
+    return np.isin(exact_edges, edges(approx)).mean() if len(exact_edges) else 1.0
+
+def knn_recall(approx_sims:ArrayLike, exact_sims:ArrayLike):
+    "Fraction of the k nearest neighbours found, from the similarities of the approximate and exact neighbours (ties count as found)"
+    return np.mean(approx_sims >= exact_sims[:, -1:] - 1e-12) if exact_sims.size else 1.0
@@ -4,18 +4,134 @@
 __all__ = ['BaseTransform', 'UMAPTransform', 'PCATransform']
 
 # %% ../../notebooks/dimensionality_reduction.ipynb 3
-from collections import defaultdict
+from collections import defaultdict, deque
 from fastcore.basics import *
 from fastcore.foundation import *
 from fastcore.meta import *
-from typing import Collection, List, Tuple
-from umap import UMAP
-from sklearn.decomposition import PCA
+from typing import Collection, Iterator, List, Tuple
+from tqdm.auto import tqdm
+from threadpoolctl import threadpool_limits
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
+# umap (which sets up numba) and sklearn are imported where they are used, so that importing this module stays fast
+
+from ..data import as_array, load_array, iter_chunks, n_chunks, is_chunked
+from ..persistence import save_model, load_model
+from ..fingerprints import FingerprintMatrix, featurize, _effective_n_jobs
 
 # %% ../../notebooks/dimensionality_reduction.ipynb 5
+def _sample_indices(n:int, n_samples:int, labels=None, random_state=None):
+    "Sorted indices of `n_samples` of `n` rows, drawn at random or, with `labels`, in proportion to each label with at least one row per label"
+    from sklearn.utils import check_random_state
+
+    rng = check_random_state(random_state)
+    if labels is not None and len(labels) != n:
+        raise ValueError(f"Got {len(labels)} labels for {n} rows")
+    if n_samples >= n:
+        return np.arange(n)
+    if labels is None:
+        return np.sort(rng.choice(n, n_samples, replace=False))
+    _, inverse, counts = np.unique(np.asarray(labels), return_inverse=True, return_counts=True)
+    quota = np.minimum(counts, np.maximum(1, np.round(n_samples * counts / n).astype(int)))
+    # shuffle, group by label, then keep the first `quota` rows of each group
+    perm = rng.permutation(n)
+    perm = perm[np.argsort(inverse[perm], kind='stable')]
+    rank = np.arange(n) - (np.cumsum(counts) - counts)[inverse[perm]]
+    return np.sort(perm[rank < quota[inverse[perm]]])
+
+def _sample_rows(data, n_samples:int, labels=None, random_state=None, chunk_size:int=10000):
+    
+    """Sample rows of `data`, returning the number of rows, the sorted indices of the sample and its rows.
+    
+    Arrays, `.npy` files and `FingerprintMatrix` are indexed directly. Chunk sources are read once: with `labels`, the
+    rows at the sampled indices are kept; otherwise each row gets a random key and the `n_samples` rows with the smallest
+    keys are kept, which is a uniform sample that never holds more than `n_samples` + one chunk of rows.
+    
+    """
+    
+    from sklearn.utils import check_random_state
+
+    rng = check_random_state(random_state)
+    if not is_chunked(data):
+        data = load_array(data)
+        idx = _sample_indices(len(data), n_samples, labels, rng)
+        return len(data), idx, as_array(data[idx])
+    
+    if labels is not None:
+        idx = _sample_indices(len(labels), n_samples, labels, rng)
+        rows, start = [], 0
+        for chunk in iter_chunks(data, chunk_size):
+            lo, hi = np.searchsorted(idx, [start, start + len(chunk)])
+            rows.append(chunk[idx[lo:hi] - start])
+            start += len(chunk)
+        if start != len(labels):
+            raise ValueError(f"Got {len(labels)} labels for {start} rows")
+        return start, idx, np.concatenate(rows)
+    
+    keys, idx, rows, start = np.zeros(0), np.zeros(0, dtype=np.int64), None, 0
+    for chunk in iter_chunks(data, chunk_size):
+        keys = np.concatenate([keys, rng.random(len(chunk))])
+        idx = np.concatenate([idx, np.arange(start, start + len(chunk))])
+        rows = chunk if rows is None else np.concatenate([rows, chunk])
+        if len(keys) > n_samples:
+            keep = np.argpartition(keys, n_samples)[:n_samples]
+            keys, idx, rows = keys[keep], idx[keep], rows[keep]
+        start += len(chunk)
+    order = np.argsort(idx)
+    return start, idx[order], rows[order]
+
+def _min_rows(chunks:Iterator, n:int):
+    "Merge consecutive chunks so that each has at least `n` rows, as `IncrementalPCA.partial_fit` needs; a short last chunk is merged into the one before it"
+    pending = None
+    for chunk in chunks:
+        pending = chunk if pending is None else np.concatenate([pending, chunk])
+        if len(pending) >= 2 * n:
+            yield pending[:len(pending) - n]
+            pending = pending[len(pending) - n:]
+    if pending is not None:
+        yield pending
+
+def _as_csr(data, block_size:int=10000):
+    "`data` as a float32 CSR matrix, converting dense data one chunk at a time"
+    from scipy.sparse import csr_matrix, issparse, vstack
+
+    if isinstance(data, FingerprintMatrix):
+        return data.to_csr(block_size)
+    if issparse(data):
+        return data.tocsr().astype(np.float32, copy=False)
+    return vstack([csr_matrix(chunk, dtype=np.float32) for chunk in iter_chunks(data, block_size)], format='csr')
+
+_worker_reducer = None
+
+def _init_transform_worker(reducer):
+    global _worker_reducer
+    _worker_reducer = reducer
+    # one thread per worker, the parallelism comes from the processes
+    threadpool_limits(1)
+    import numba
+    numba.set_num_threads(1)
+
+def _worker_transform(chunk):
+    return _worker_reducer.transform(chunk)
+
+def _transform_chunks(reducer, chunks:Iterator, n_jobs:int=1):
+    "Yield `reducer.transform` of each chunk, in order, optionally in a process pool with at most `2 * n_jobs` chunks in flight"
+    n_jobs = _effective_n_jobs(n_jobs)
+    if n_jobs == 1:
+        yield from map(reducer.transform, chunks)
+        return
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import get_context
+    # forking after numba has started its threads can deadlock, so the workers are spawned
+    with ProcessPoolExecutor(max_workers=n_jobs, mp_context=get_context('spawn'), initializer=_init_transform_worker, initargs=(reducer,)) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_worker_transform, chunk))
+            if len(pending) >= 2 * n_jobs:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+# %% ../../notebooks/dimensionality_reduction.ipynb 6
 class BaseTransform:
     """Base class to perform dimensionality reduction on a dataset. """
     
@@ -29,11 +145,41 @@ class BaseTransform:
     @reducer.setter
     def reducer(self, i):
         self._reducer = i
+    
+    def save(self, path):
+        "Save the fitted reducer and the embeddings to the directory `path`, without the dataset (see `molcluster.persistence.save_model`)"
+        save_model(self, path)
+        
+    @classmethod
+    def load(cls, path, mmap_mode:str='r'):
+        "Load a transform saved with `save`. Its arrays are memory-mapped unless `mmap_mode=None`"
+        model = load_model(path, mmap_mode=mmap_mode)
+        if not isinstance(model, cls):
+            raise TypeError(f"{path} contains a {type(model).__name__}, not a {cls.__name__}")
+        return model
+    
+    @classmethod
+    def from_smiles(cls, smiles, fp_type:str='rdkit', nbits:int=2048, radius:int=2, dense:bool=False, column:str=None,
+                    n_jobs:int=1, **kwargs):
+        
+        """Create the transform from SMILES, or a DataFrame column, featurized with `molcluster.fingerprints.featurize`.
+        
+        The dataset is a `FingerprintMatrix`, or a dense array with `dense=True` or `fp_type='descriptors'`. SMILES that
+        cannot be parsed are left out of the dataset (and so of the embeddings) and their positions are stored in
+        `invalid_idx`. `kwargs` are passed to `featurize`, e.g. `out` to write the features to a memory-mapped file.
+        
+        """
+        
+        X, invalid_idx = featurize(smiles, fp_type, nbits, radius, dense=dense, column=column, n_jobs=n_jobs, **kwargs)
+        model = cls(X)
+        model.invalid_idx = invalid_idx
+        return model
 
 class UMAPTransform(BaseTransform):
     """Calculate UMAP embeddings"""
     
     def __init__(self, dataset : np.array):
+        "`dataset` is an array of features with shape (n,p) or a `FingerprintMatrix`"
         self.dataset = dataset
             
     def reduce(self, n_neighbors:int=30, min_dist:float=0.5, **kwargs):
@@ -62,19 +208,103 @@ class UMAPTransform(BaseTransform):
         """
 
         
+        from umap import UMAP
+
         reducer = UMAP(n_neighbors=n_neighbors, min_dist=min_dist, **kwargs)
-        embeddings = reducer.fit_transform(self.dataset)
+        embeddings = reducer.fit_transform(as_array(self.dataset))
         
         self._reducer = reducer
+        self.embeddings = embeddings
+        return embeddings
+    
+    def reduce_streaming(self, n_samples:int=100000, n_neighbors:int=30, min_dist:float=0.5, labels=None, supervised:bool=False,
+                         out=None, batch_size:int=10000, n_jobs:int=1, random_state=None, progress:bool=True, **kwargs):
+        
+        """Fit UMAP on a sample of the dataset and project the whole dataset with `transform`, one chunk at a time
+        
+        Memory use is bounded by the sample and `n_jobs` chunks in flight, so `dataset` can be larger than memory: a
+        memory-mapped array, a `FingerprintMatrix`, the path to a `.npy` file or a callable that returns a new iterator of
+        chunks (see `molcluster.data.iter_chunks`). Iterators cannot be used, because the dataset is read twice.
+        
+        Parameters:
+        
+            n_samples : int (optional, default=100000)
+                Number of rows UMAP is fitted on. The whole dataset is used if it is smaller.
+                
+            n_neighbors, min_dist : (optional, default=30, 0.5)
+                See `reduce`
+                
+            labels : array (optional, default=None)
+                Cluster labels of every row, e.g. from `molcluster.unsupervised_learning.clustering`. The sample is then
+                stratified, with each cluster represented in proportion to its size and at least once.
+                
+            supervised : bool (optional, default=False)
+                Also pass the labels of the sample to `UMAP.fit` as targets, so that clusters are kept apart in the
+                embedding. Rows labelled -1 (noise) are treated as unlabelled.
+                
+            out : str or Path (optional, default=None)
+                Path of a `.npy` file the embeddings are written to as they are computed. The returned embeddings are then
+                a memory map of that file. By default they are kept in memory.
+                
+            batch_size : int (optional, default=10000)
+                Number of rows transformed at a time
+                
+            n_jobs : int (optional, default=1)
+                Number of worker processes for `transform`. The workers are spawned rather than forked, so scripts that use
+                `n_jobs > 1` need an `if __name__ == '__main__':` guard.
+                
+            random_state : int (optional, default=None)
+                Seed of the sample and of UMAP
+                
+            progress : bool (optional, default=True)
+                Show a progress bar for the transform
+            
+            Keyword arguments:
+        
+                See UMAP documentation for the complete list of arguments (https://umap-learn.readthedocs.io/en/latest/parameters.html)
+                
+        Returns:
+        
+            embeddings : np.array of float32
+                The sampled rows are in `self.sample_idx`.
+        
+        """
+        
+        from umap import UMAP
+
+        if is_chunked(self.dataset) and not callable(self.dataset):
+            raise ValueError("Iterators can only be read once, pass a callable that returns a new iterator of chunks instead")
+        if supervised and labels is None:
+            raise ValueError("`supervised=True` needs `labels`")
+        
+        n, sample_idx, sample = _sample_rows(self.dataset, n_samples, labels, random_state, batch_size)
+        reducer = UMAP(n_neighbors=n_neighbors, min_dist=min_dist, random_state=random_state, **kwargs)
+        reducer.fit(sample, y=np.asarray(labels)[sample_idx] if supervised else None)
+        del sample
+        
+        shape = (n, reducer.n_components)
+        embeddings = np.empty(shape, dtype=np.float32) if out is None else np.lib.format.open_memmap(out, mode='w+', dtype=np.float32, shape=shape)
+        start = 0
+        for chunk in tqdm(_transform_chunks(reducer, iter_chunks(self.dataset, batch_size), n_jobs), total=n_chunks(self.dataset, batch_size),
+                          disable=not progress, desc="Transforming", unit='chunk'):
+            embeddings[start:start+len(chunk)] = chunk
+            start += len(chunk)
+        if out is not None:
+            embeddings.flush()
+            
+        self._reducer = reducer
+        self.sample_idx = sample_idx
+        self.embeddings = embeddings
         return embeddings
 
 class PCATransform(BaseTransform):
-    """Calculate UMAP embeddings"""
+    """Calculate PCA embeddings"""
     
     def __init__(self, dataset : np.array):
+        "`dataset` is an array of features with shape (n,p), a `FingerprintMatrix` or, for `solver='truncated_svd'`, a scipy sparse matrix"
         self.dataset = dataset
             
-    def reduce(self, n_components=None, **kwargs):
+    def reduce(self, n_components=None, solver:str='pca', batch_size:int=10000, **kwargs):
         """Performs dimensionality reduction on a dataset using Principal Component Analysis (PCA)
         
         Parameters:
@@ -95,15 +325,44 @@ class PCATransform(BaseTransform):
                 
             n_components == min(n_samples, n_features) - 1
             
+            solver : str, default='pca'
+                'pca' fits `sklearn.decomposition.PCA` on the whole dataset, as a dense float32 array.
+                'incremental' fits `IncrementalPCA` with `partial_fit`, one chunk of `batch_size` rows at a time, so only
+                one dense chunk is in memory. The dataset can then be anything `molcluster.data.iter_chunks` reads,
+                except a one-shot iterator, because it is read twice.
+                'truncated_svd' runs a randomized `TruncatedSVD` on a float32 CSR matrix of the dataset, built from the
+                packed bits of a `FingerprintMatrix` without densifying it. The data is not centred, so the first
+                component mostly follows the number of bits set.
+                
+            batch_size : int, default=10000
+                Number of rows per chunk for 'incremental', and per converted block for 'truncated_svd'
+            
             Keyword arguments:
         
-                See PCA documentation for the complete list of arguments (https://scikit-learn.org/stable/modules/generated/sklearn.decomposition.PCA.html)        
+                See the documentation of PCA (https://scikit-learn.org/stable/modules/generated/sklearn.decomposition.PCA.html),
+                IncrementalPCA or TruncatedSVD for the complete list of arguments
         """
 
-        
-        reducer = PCA(n_components=n_components, **kwargs)
-        embeddings = reducer.fit_transform(self.dataset)
+        from sklearn.decomposition import PCA, IncrementalPCA, TruncatedSVD
+
+        if solver == 'pca':
+            reducer = PCA(n_components=n_components, **kwargs)
+            embeddings = reducer.fit_transform(as_array(self.dataset))
+        elif solver == 'incremental':
+            if is_chunked(self.dataset) and not callable(self.dataset):
+                raise ValueError("Iterators can only be read once, pass a callable that returns a new iterator of chunks instead")
+            reducer = IncrementalPCA(n_components=n_components, **kwargs)
+            for chunk in _min_rows(iter_chunks(self.dataset, batch_size, dtype=np.float32), n_components or 1):
+                reducer.partial_fit(chunk)
+            embeddings = np.concatenate([reducer.transform(chunk).astype(np.float32) for chunk in iter_chunks(self.dataset, batch_size, dtype=np.float32)])
+        elif solver == 'truncated_svd':
+            if n_components is None:
+                raise ValueError("solver='truncated_svd' needs an integer n_components")
+            reducer = TruncatedSVD(n_components=n_components, algorithm=kwargs.pop('algorithm', 'randomized'), **kwargs)
+            embeddings = reducer.fit_transform(_as_csr(self.dataset, batch_size))
+        else:
+            raise ValueError(f"Unknown solver {solver}, use 'pca', 'incremental' or 'truncated_svd'")
         
         self._reducer = reducer
+        self.embeddings = embeddings
         return embeddings
-
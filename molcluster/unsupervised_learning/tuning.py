@@ -0,0 +1,232 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../../notebooks/tuning.ipynb.
+
+# %% auto 0
+__all__ = ['tune_clustering']
+
+# %% ../../notebooks/tuning.ipynb 3
+import numpy as np
+import copy
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable
+
+from ..typing_basics import *
+from ..data import as_array
+from ..fingerprints import FingerprintMatrix, smiles_to_fps
+from .similarity import tanimoto_distances, packed_tanimoto_neighbours, butina_clusters
+from .clustering import HierarchicalClustering, HDBSCANClustering, ButinaClustering
+from .validation import silhouette_score, dbcv_score, davies_bouldin_score
+
+# %% ../../notebooks/tuning.ipynb 6
+_SCORES = {'silhouette': 'maximize', 'dbcv': 'maximize', 'davies_bouldin': 'minimize'}
+
+class _TuningData(ABC):
+    
+    """Data shared by the trials of `tune_clustering`: the subsets of the dataset (`None` is the whole dataset), the points
+    to score, and the precomputations of the subclasses."""
+    
+    default_space, default_score = {}, 'silhouette'
+    
+    def __init__(self, model, metric:str, search_space:dict, subsample_sizes:List, random_state, cluster_kwargs:dict):
+        self.model, self.metric, self.search_space, self.cluster_kwargs = model, metric, search_space, cluster_kwargs
+        self.X = self.prepare_points()
+        n = len(self.X)
+        order = np.random.default_rng(random_state).permutation(n)
+        self.steps = [np.sort(order[:size]) for size in sorted(subsample_sizes or []) if size < n] + [None]
+        self._lock = threading.Lock()
+        self._cache = {}
+        
+    def prepare_points(self):
+        "Points used by the score: a `FingerprintMatrix` with `metric='tanimoto'`, dense features otherwise"
+        X = self.model.dataset
+        if self.metric == 'tanimoto':
+            return X if isinstance(X, FingerprintMatrix) else FingerprintMatrix.from_array(as_array(X))
+        return as_array(X)
+    
+    def points(self, step:int):
+        idx = self.steps[step]
+        return self.X if idx is None else self.X[idx]
+    
+    def cached(self, key, func:Callable):
+        "`func()`, computed by the first trial that needs it"
+        with self._lock:
+            if key not in self._cache:
+                self._cache[key] = func()
+            return self._cache[key]
+        
+    def score(self, name:str, labels:ArrayLike, step:int):
+        X = self.points(step)
+        if name == 'silhouette':
+            return silhouette_score(X, labels, metric=self.metric)
+        if name == 'dbcv':
+            return dbcv_score(X, labels, metric=self.metric)
+        return davies_bouldin_score(X, labels)
+    
+    @abstractmethod
+    def labels(self, params:dict, step:int):
+        "Labels of the subset `step` clustered with the parameters `params` of a trial"
+        
+    def refit(self, params:dict):
+        return self.model.cluster(**self.cluster_kwargs, **params)
+        
+class _HDBSCANTuning(_TuningData):
+    
+    default_space, default_score = {'min_cluster_size': (5, 100), 'min_samples': (1, 50)}, 'dbcv'
+    
+    def labels(self, params:dict, step:int):
+        idx = self.steps[step]
+        if idx is not None:
+            # the same parameters relative to the size of the subset
+            frac = len(idx) / len(self.X)
+            params = {'min_cluster_size': max(2, round(params['min_cluster_size'] * frac)),
+                      'min_samples': max(1, round(params['min_samples'] * frac)) if params.get('min_samples') else params.get('min_samples')}
+        if self.metric != 'tanimoto':
+            return HDBSCANClustering(self.points(step)).cluster(metric=self.metric, **self.cluster_kwargs, **params)
+        distances = self.cached(('distances', step), lambda: tanimoto_distances(self.points(step)))
+        return HDBSCANClustering(distances).cluster(metric='precomputed', **self.cluster_kwargs, **params)
+    
+    def refit(self, params:dict):
+        return self.model.cluster(metric=self.metric, **self.cluster_kwargs, **params)
+    
+class _ButinaTuning(_TuningData):
+    
+    default_space, default_score = {'sim_cutoff': (0.3, 0.8)}, 'silhouette'
+    
+    def prepare_points(self):
+        nbits, radius, _ = self.model._fp_params(self.cluster_kwargs.get('nbits'), self.cluster_kwargs.get('radius'))
+        fps, self.invalid_idx = smiles_to_fps(self.model.dataset, self.model.fp_type, nbits, radius, progress=False)
+        return FingerprintMatrix.from_fps(fps)
+    
+    def labels(self, params:dict, step:int):
+        X = self.points(step)
+        # the graph at the loosest cutoff of the search space contains the graphs of all the others
+        min_cutoff = min(self.search_space['sim_cutoff'])
+        graph = self.cached(('graph', step), lambda: packed_tanimoto_neighbours(X.bits, X.counts, min_cutoff))
+        return butina_clusters(graph.filter(params['sim_cutoff']))[0]
+    
+class _HierarchicalTuning(_TuningData):
+    
+    default_space, default_score = {'n_clusters': (2, 100), 'linkage': ['ward', 'average', 'complete']}, 'silhouette'
+    
+    def labels(self, params:dict, step:int):
+        linkage = params.get('linkage', self.cluster_kwargs.get('linkage', 'ward'))
+        def fit():
+            model = HierarchicalClustering(self.points(step))
+            model.fit_tree(linkage=linkage, affinity=self.metric)
+            return model
+        tree = self.cached(('tree', step, linkage), fit)
+        return copy.copy(tree).cut(n_clusters=params['n_clusters'])
+    
+    def refit(self, params:dict):
+        return self.model.cluster(affinity=self.metric, **{**self.cluster_kwargs, **params})
+
+def _suggest(trial, search_space:dict):
+    "Parameters of a trial: a list is a categorical choice, a (low, high) tuple an int or float range"
+    params = {}
+    for name, space in search_space.items():
+        if isinstance(space, list):
+            params[name] = trial.suggest_categorical(name, space)
+        elif all(isinstance(v, (int, np.integer)) for v in space):
+            params[name] = trial.suggest_int(name, *space)
+        else:
+            params[name] = trial.suggest_float(name, *space)
+    return params
+
+# %% ../../notebooks/tuning.ipynb 7
+_TUNING = {HDBSCANClustering: _HDBSCANTuning, ButinaClustering: _ButinaTuning, HierarchicalClustering: _HierarchicalTuning}
+
+def tune_clustering(model, n_trials:int=50, score:str=None, search_space:dict=None, metric:str=None, subsample_sizes:List=None,
+                    n_jobs:int=1, timeout:float=None, random_state=None, refit:bool=True, **cluster_kwargs):
+    
+    """Search the parameters of `model` that optimise a validation score with optuna.
+    
+    The precomputations of the method (distance matrix, fingerprints and neighbour graph, or trees) are done once and shared
+    by all the trials, and the trials can be pruned on subsets of the dataset before the whole dataset is clustered.
+    
+    Arguments:
+    
+        model : HDBSCANClustering, ButinaClustering or HierarchicalClustering
+            The clustering object to tune.
+            
+        n_trials : int, optional (default=50)
+            Number of trials.
+            
+        score : str, optional (default=None)
+            'silhouette' or 'dbcv' (maximised), or 'davies_bouldin' (minimised), see `molcluster.unsupervised_learning.validation`.
+            By default 'dbcv' for HDBSCAN, which penalises noise, and 'silhouette' otherwise. Trials with fewer than two
+            clusters are pruned.
+            
+        search_space : dict, optional (default=None)
+            Parameters to search: a (low, high) tuple for a range of ints or floats, a list for a categorical choice. By
+            default `min_cluster_size` (5, 100) and `min_samples` (1, 50) for HDBSCAN, `sim_cutoff` (0.3, 0.8) for Butina,
+            `n_clusters` (2, 100) and `linkage` ['ward', 'average', 'complete'] for hierarchical clustering.
+            
+        metric : str, optional (default=None)
+            Metric of the clustering and of the score: 'tanimoto' (the default for `FingerprintMatrix` datasets and for
+            Butina, which always uses Tanimoto similarities) or 'euclidean'.
+            
+        subsample_sizes : list, optional (default=None)
+            Sizes of the subsets on which each trial is scored, and possibly pruned, before the whole dataset. For HDBSCAN,
+            `min_cluster_size` and `min_samples` are scaled to the size of the subset.
+            
+        n_jobs : int, optional (default=1)
+            Number of trials run in parallel, in threads that share the precomputations. The kernels of NumPy and SciPy
+            release the GIL, but the Python parts of the clustering methods do not, so the speed-up is partial.
+            
+        timeout : float, optional (default=None)
+            Stop the search after this many seconds.
+            
+        random_state : int, optional (default=None)
+            Seed of the sampler and of the subsets.
+            
+        refit : bool, optional (default=True)
+            Run `model.cluster` with the best parameters, so that `model.labels` holds the best clustering.
+            
+    Keyword arguments:
+    
+        Fixed parameters passed to every clustering, e.g. `nbits` and `radius` for Butina or `cluster_selection_method`
+        for HDBSCAN.
+            
+    Returns:
+    
+        study : optuna.Study
+            The study, with `best_params` and `best_value`. The number of clusters and the fraction of noise of each trial
+            on the whole dataset are stored in its `user_attrs`.
+    
+    """
+    
+    import optuna
+    
+    tuning = _TUNING.get(type(model))
+    if tuning is None:
+        raise TypeError(f"Tuning is not supported for {type(model).__name__}")
+    if metric is None:
+        metric = 'tanimoto' if isinstance(model, ButinaClustering) or isinstance(model.dataset, FingerprintMatrix) else 'euclidean'
+    score = tuning.default_score if score is None else score
+    if score not in _SCORES:
+        raise ValueError(f"Unknown score {score}, use one of {list(_SCORES)}")
+    search_space = tuning.default_space if search_space is None else search_space
+    data = tuning(model, metric, search_space, subsample_sizes, random_state, cluster_kwargs)
+    
+    def objective(trial):
+        params = _suggest(trial, search_space)
+        for step in range(len(data.steps)):
+            labels = np.asarray(data.labels(params, step))
+            n_clusters = len(np.unique(labels[labels >= 0]))
+            if not 2 <= n_clusters <= np.count_nonzero(labels >= 0) - 1:
+                raise optuna.TrialPruned(f"{n_clusters} clusters")
+            value = data.score(score, labels, step)
+            if step < len(data.steps) - 1:
+                trial.report(value, step)
+                if trial.should_prune():
+                    raise optuna.TrialPruned()
+        trial.set_user_attr('n_clusters', n_clusters)
+        trial.set_user_attr('noise_fraction', float(np.mean(labels < 0)))
+        return value
+    
+    study = optuna.create_study(direction=_SCORES[score], sampler=optuna.samplers.TPESampler(seed=random_state),
+                                pruner=optuna.pruners.MedianPruner(n_startup_trials=5))
+    study.optimize(objective, n_trials=n_trials, timeout=timeout, n_jobs=n_jobs)
+    if refit and any(t.state == optuna.trial.TrialState.COMPLETE for t in study.trials):
+        data.refit(study.best_params)
+    return study
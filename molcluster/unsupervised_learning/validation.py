@@ -0,0 +1,520 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../../notebooks/validation.ipynb.
+
+# %% auto 0
+__all__ = ['silhouette_samples', 'silhouette_score', 'davies_bouldin_score', 'dbcv_score', 'tanimoto_cluster_stats', 'Estimate',
+           'estimate_score']
+
+# %% ../../notebooks/validation.ipynb 3
+import numpy as np
+import copy
+from functools import partial
+from typing import Callable, NamedTuple
+from statistics import NormalDist
+from threadpoolctl import threadpool_limits
+
+from ..typing_basics import *
+from ..data import as_array, iter_chunks, load_array
+from ..fingerprints import FingerprintMatrix, _effective_n_jobs
+from .similarity import tanimoto_block
+
+# %% ../../notebooks/validation.ipynb 6
+class _Points:
+    
+    "Molecules to compare: packed fingerprints with `metric='tanimoto'`, dense features otherwise"
+    
+    def __init__(self, X, metric:str='tanimoto'):
+        self.metric = metric
+        if metric == 'tanimoto':
+            fpm = X if isinstance(X, FingerprintMatrix) else FingerprintMatrix.from_array(X)
+            self.bits, self.counts, self.dim = fpm.bits, fpm.counts, fpm.nbits
+        else:
+            self.features = as_array(X)
+            self.dim = self.features.shape[1]
+            
+    def __len__(self):
+        return len(self.bits) if self.metric == 'tanimoto' else len(self.features)
+    
+    def take(self, idx:ArrayLike):
+        "The molecules `idx`, in that order"
+        points = copy.copy(self)
+        if self.metric == 'tanimoto':
+            points.bits, points.counts = np.ascontiguousarray(self.bits[idx]), self.counts[idx]
+        else:
+            points.features = np.ascontiguousarray(self.features[idx])
+        return points
+    
+    def distances(self, rows, cols):
+        "Distance matrix between the molecules `rows` and `cols` (index arrays or slices)"
+        if self.metric == 'tanimoto':
+            return 1 - tanimoto_block(self.bits[rows], self.counts[rows], self.bits[cols], self.counts[cols])
+        from sklearn.metrics import pairwise_distances
+        return pairwise_distances(self.features[rows], self.features[cols], metric=self.metric)
+
+def _init_validation_worker(points):
+    global _worker_points
+    _worker_points = points
+    # one thread per worker, the parallelism comes from the processes
+    threadpool_limits(1)
+
+def _worker_call(func, *args):
+    return func(_worker_points, *args)
+
+def _map_tasks(func, points:_Points, tasks:List, n_jobs:int=1):
+    "`func(points, *task)` for each task, in order, optionally in a spawned process pool that holds one copy of `points` per worker"
+    n_jobs = _effective_n_jobs(n_jobs)
+    if n_jobs == 1 or len(tasks) < 2:
+        return [func(points, *task) for task in tasks]
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import get_context
+    with ProcessPoolExecutor(max_workers=n_jobs, mp_context=get_context('spawn'), initializer=_init_validation_worker, initargs=(points,)) as pool:
+        return list(pool.map(partial(_worker_call, func), *zip(*tasks)))
+
+def _row_blocks(n:int, block_size:int, n_columns:int=None):
+    "(start, stop) row ranges with about `block_size**2` pairs against `n_columns` columns"
+    rows = max(1, min(block_size, block_size**2 // max(n_columns or block_size, 1)))
+    return [(start, min(start + rows, n)) for start in range(0, n, rows)]
+
+def _clustered(labels:ArrayLike):
+    "Indices of the non-noise molecules sorted by label, and their labels renumbered from 0"
+    labels = np.asarray(labels)
+    idx = np.flatnonzero(labels >= 0)
+    idx = idx[np.argsort(labels[idx], kind='stable')]
+    uniques, codes = np.unique(labels[idx], return_inverse=True)
+    return idx, codes, uniques
+
+# %% ../../notebooks/validation.ipynb 8
+def _silhouette_rows(points:_Points, start:int, stop:int, block_size:int):
+    "Silhouettes of the rows start:stop of points sorted by label"
+    labels = points.labels
+    sizes = np.bincount(labels)
+    sums = np.zeros((stop - start, len(sizes)))
+    for j in range(0, len(points), block_size):
+        cols = labels[j:j+block_size]
+        first = np.flatnonzero(np.r_[True, cols[1:] != cols[:-1]])
+        sums[:, cols[first]] += np.add.reduceat(points.distances(slice(start, stop), slice(j, j + block_size)), first, axis=1)
+    own, rows = labels[start:stop], np.arange(stop - start)
+    a = sums[rows, own] / np.maximum(sizes[own] - 1, 1)
+    means = sums / sizes
+    means[rows, own] = np.inf
+    b = means.min(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        sil = (b - a) / np.maximum(a, b)
+    sil[sizes[own] == 1] = 0
+    return np.nan_to_num(sil)
+
+def silhouette_samples(X, labels:ArrayLike, metric:str='tanimoto', block_size:int=1024, n_jobs:int=1):
+    
+    """Silhouette coefficient of each molecule, as `sklearn.metrics.silhouette_samples`, without the n x n distance matrix.
+    
+    The mean distances of each molecule to every cluster are accumulated over blocks of columns, so the memory is about
+    `block_size**2` distances per process, and the blocks of rows are spread over `n_jobs` processes.
+    
+    Arguments:
+    
+        X : FingerprintMatrix or array
+            Fingerprints (`metric='tanimoto'`) or features of the molecules.
+            
+        labels : array
+            Cluster labels, -1 for noise.
+            
+        metric : str, optional (default='tanimoto')
+            'tanimoto', or any metric of `sklearn.metrics.pairwise_distances`.
+            
+        block_size : int, optional (default=1024)
+            Number of rows and columns of the distance blocks.
+            
+        n_jobs : int, optional (default=1)
+            Number of processes.
+            
+    Returns:
+    
+        silhouettes : np.array
+            Silhouette of each molecule, NaN for noise.
+    
+    """
+    
+    idx, codes, uniques = _clustered(labels)
+    if not 2 <= len(uniques) <= len(idx) - 1:
+        raise ValueError(f"Number of labels is {len(uniques)}. Valid values are 2 to n_samples - 1 (inclusive)")
+    points = _Points(X, metric).take(idx)
+    points.labels = codes
+    tasks = [(start, stop, block_size) for start, stop in _row_blocks(len(idx), block_size, len(uniques))]
+    silhouettes = np.full(len(labels), np.nan)
+    silhouettes[idx] = np.concatenate(_map_tasks(_silhouette_rows, points, tasks, n_jobs))
+    return silhouettes
+
+def silhouette_score(X, labels:ArrayLike, metric:str='tanimoto', block_size:int=1024, n_jobs:int=1):
+    "Mean silhouette coefficient of the clustered molecules (see `silhouette_samples`)"
+    return float(np.nanmean(silhouette_samples(X, labels, metric=metric, block_size=block_size, n_jobs=n_jobs)))
+
+# %% ../../notebooks/validation.ipynb 13
+def davies_bouldin_score(X, labels:ArrayLike, chunk_size:int=10000, block_size:int=1024):
+    
+    """Davies-Bouldin index, as `sklearn.metrics.davies_bouldin_score`, in two passes over chunks of `X`.
+    
+    The index compares the spread of each cluster around its centroid with the distances between centroids, so it is
+    defined on the features: fingerprints are used as vectors of 0/1 with Euclidean distances. It needs O(n) time and
+    O(n_clusters * n_features) memory, so it is always exact.
+    
+    Arguments:
+    
+        X : FingerprintMatrix, array, str, callable or iterator
+            Features of the molecules, in any format of `molcluster.data.iter_chunks`. Chunk sources are read twice.
+            
+        labels : array
+            Cluster labels, -1 for noise.
+            
+        chunk_size : int, optional (default=10000)
+            Number of rows read at a time.
+            
+        block_size : int, optional (default=1024)
+            Number of centroids compared at a time.
+            
+    Returns:
+    
+        score : float
+            The lower, the better separated the clusters.
+    
+    """
+    
+    from scipy.sparse import csr_matrix
+    from sklearn.metrics import pairwise_distances
+    
+    labels = np.asarray(labels)
+    uniques, codes = np.unique(labels, return_inverse=True)
+    codes = np.where(labels >= 0, codes - np.count_nonzero(uniques < 0), -1)
+    uniques = uniques[uniques >= 0]
+    n_clusters, n = len(uniques), np.count_nonzero(codes >= 0)
+    if not 2 <= n_clusters <= n - 1:
+        raise ValueError(f"Number of labels is {n_clusters}. Valid values are 2 to n_samples - 1 (inclusive)")
+    sizes = np.bincount(codes[codes >= 0], minlength=n_clusters)
+    
+    def clustered_chunks():
+        start = 0
+        for chunk in iter_chunks(X, chunk_size, dtype=np.float64):
+            chunk_codes = codes[start:start+len(chunk)]
+            start += len(chunk)
+            keep = chunk_codes >= 0
+            yield chunk[keep], chunk_codes[keep]
+    
+    centroids = 0
+    for chunk, chunk_codes in clustered_chunks():
+        onehot = csr_matrix((np.ones(len(chunk)), (chunk_codes, np.arange(len(chunk)))), shape=(n_clusters, len(chunk)))
+        centroids = centroids + onehot @ chunk
+    centroids = centroids / sizes[:, None]
+    intra = np.zeros(n_clusters)
+    for chunk, chunk_codes in clustered_chunks():
+        intra += np.bincount(chunk_codes, weights=np.linalg.norm(chunk - centroids[chunk_codes], axis=1), minlength=n_clusters)
+    intra /= sizes
+    
+    scores, max_distance = np.zeros(n_clusters), 0
+    for start in range(0, n_clusters, block_size):
+        distances = pairwise_distances(centroids[start:start+block_size], centroids)
+        max_distance = max(max_distance, distances.max())
+        # the distance of a centroid to itself is not exactly 0 when it is computed from two different arrays
+        distances[np.arange(len(distances)), np.arange(start, start + len(distances))] = 0
+        distances[distances == 0] = np.inf
+        scores[start:start+block_size] = ((intra[start:start+block_size, None] + intra[None, :]) / distances).max(axis=1)
+    if np.allclose(intra, 0) or np.isclose(max_distance, 0):
+        return 0.0
+    return float(np.mean(scores))
+
+# %% ../../notebooks/validation.ipynb 17
+def _dbcv_cluster(points:_Points, start:int, stop:int, d:float, block_size:int):
+    
+    """Core distances, internal nodes and density sparseness of the cluster in rows start:stop, as `hdbscan.validity`.
+    
+    The all-points core distance is (mean of `dist**-d` over the other members)**(-1/d), computed in log space, because
+    `dist**-d` overflows for thousands of dimensions (e.g. fingerprint bits). The minimum spanning tree of the mutual
+    reachability distances is built with Prim's algorithm one row at a time, from the full distance matrix of the cluster
+    if it has fewer than `4 * block_size` members.
+    
+    """
+    
+    from scipy.special import logsumexp
+    
+    n = stop - start
+    if n == 1:
+        return np.zeros(1), np.array([start]), 0.0
+    dense = n <= 4 * block_size
+    if dense:
+        D = points.distances(slice(start, stop), slice(start, stop))
+        D[np.diag_indices(n)] = 0
+    def distance_rows(r0, r1):
+        if dense:
+            return D[r0:r1]
+        rows = points.distances(slice(start + r0, start + r1), slice(start, stop))
+        rows[np.arange(r1 - r0), np.arange(r0, r1)] = 0
+        return rows
+    
+    log_sums = np.empty(n)
+    for r0, r1 in _row_blocks(n, block_size, n):
+        dist = distance_rows(r0, r1)
+        with np.errstate(divide='ignore'):
+            log_sums[r0:r1] = logsumexp(np.where(dist > 0, -d * np.log(dist), -np.inf), axis=1)
+    if np.all(np.isneginf(log_sums)):
+        core = np.zeros(n)
+    else:
+        core = np.exp(-(log_sums - np.log(n - 1)) / d)
+    
+    in_tree, current = np.zeros(n, dtype=bool), np.full(n, np.inf)
+    src, dst, weights = [], [], []
+    node, weight = 0, 0.0
+    for step in range(n):
+        in_tree[node] = True
+        row = np.maximum(np.maximum(distance_rows(node, node + 1)[0], core[node]), core)
+        if step > 0:
+            # like hdbscan, the edge starts from the first node of the tree at that distance
+            candidates = np.flatnonzero(in_tree & np.isclose(row, weight))
+            src.append(candidates[candidates != node][0])
+            dst.append(node)
+            weights.append(weight)
+        if step == n - 1:
+            break
+        np.minimum(current, row, out=current)
+        candidates = np.where(in_tree, np.inf, current)
+        node = int(np.argmin(candidates))
+        weight = candidates[node]
+    
+    src, dst, weights = np.array(src), np.array(dst), np.array(weights)
+    internal = np.flatnonzero(np.bincount(np.concatenate([src, dst]), minlength=n) > 1)
+    if not len(internal):
+        internal = np.array([0])
+    selected = np.isin(src, internal) & np.isin(dst, internal)
+    sparseness = (weights[selected] if selected.any() else weights).max()
+    return core, internal + start, sparseness
+
+def _dbcv_separation_rows(points:_Points, start:int, stop:int, block_size:int):
+    "Smallest mutual reachability distance from the internal nodes start:stop to the internal nodes of the other clusters"
+    labels, core = points.labels, points.core
+    separation = np.full(stop - start, np.inf)
+    for j in range(0, len(points), block_size):
+        mr = points.distances(slice(start, stop), slice(j, j + block_size))
+        np.maximum(mr, core[start:stop, None], out=mr)
+        np.maximum(mr, core[None, j:j+block_size], out=mr)
+        mr[labels[start:stop, None] == labels[None, j:j+block_size]] = np.inf
+        np.minimum(separation, mr.min(axis=1), out=separation)
+    return separation
+
+def dbcv_score(X, labels:ArrayLike, metric:str='tanimoto', d:int=None, per_cluster_scores:bool=False,
+               block_size:int=1024, n_jobs:int=1):
+    
+    """Density-based cluster validity index (DBCV, Moulavi et al. 2014), as `hdbscan.validity_index`, in blocks.
+    
+    The core distances and the minimum spanning tree of each cluster only need distances within the cluster, and each
+    cluster is processed by one of `n_jobs` processes. The density separation is then computed in blocks of rows between
+    the internal nodes of the trees. The time is O(sum of the squared cluster sizes + squared number of internal nodes),
+    and the memory about `block_size**2` distances per process (or the distance matrix of clusters smaller than
+    `4 * block_size`).
+    
+    Arguments:
+    
+        X : FingerprintMatrix or array
+            Fingerprints (`metric='tanimoto'`) or features of the molecules.
+            
+        labels : array
+            Cluster labels, -1 for noise. Noise points lower the score through the weights of the clusters.
+            
+        metric : str, optional (default='tanimoto')
+            'tanimoto', or any metric of `sklearn.metrics.pairwise_distances`.
+            
+        d : int, optional (default=None)
+            Dimension used by the core distances, the number of bits or features by default.
+            
+        per_cluster_scores : bool, optional (default=False)
+            Also return the validity index of each cluster.
+            
+        block_size : int, optional (default=1024)
+            Number of rows and columns of the distance blocks.
+            
+        n_jobs : int, optional (default=1)
+            Number of processes.
+            
+    Returns:
+    
+        score : float
+            Between -1 and 1, the higher the better.
+            
+        cluster_scores : np.array
+            Validity index of each cluster, in the order of the sorted labels, if `per_cluster_scores`.
+    
+    """
+    
+    idx, codes, uniques = _clustered(labels)
+    points = _Points(X, metric).take(idx)
+    d = points.dim if d is None else d
+    sizes = np.bincount(codes, minlength=len(uniques))
+    bounds = np.concatenate([[0], np.cumsum(sizes)])
+    clusters = _map_tasks(_dbcv_cluster, points, [(start, stop, d, block_size) for start, stop in zip(bounds[:-1], bounds[1:])], n_jobs)
+    core = np.concatenate([c[0] for c in clusters])
+    internal = np.concatenate([c[1] for c in clusters])
+    sparseness = np.array([c[2] for c in clusters])
+    
+    points = points.take(internal)
+    points.labels, points.core = codes[internal], core[internal]
+    tasks = [(start, stop, block_size) for start, stop in _row_blocks(len(internal), block_size)]
+    row_separation = np.concatenate(_map_tasks(_dbcv_separation_rows, points, tasks, n_jobs))
+    separation = np.full(len(uniques), np.inf)
+    np.minimum.at(separation, points.labels, row_separation)
+    
+    with np.errstate(invalid='ignore'):
+        cluster_scores = (separation - sparseness) / np.maximum(separation, sparseness)
+    score = float(np.sum(sizes / len(labels) * cluster_scores))
+    return (score, cluster_scores) if per_cluster_scores else score
+
+# %% ../../notebooks/validation.ipynb 21
+def _tanimoto_stats_rows(points:_Points, rows:ArrayLike, block_size:int):
+    "Mean and min similarity of each row to the other members of its cluster, mean and max similarity to the other clusters"
+    labels = points.labels
+    sizes = np.bincount(labels)
+    own = labels[rows]
+    intra_sum, inter_sum = np.zeros(len(rows)), np.zeros(len(rows))
+    intra_min, inter_max = np.full(len(rows), np.inf), np.full(len(rows), -np.inf)
+    for j in range(0, len(points), block_size):
+        cols = np.arange(j, min(j + block_size, len(points)))
+        sims = tanimoto_block(points.bits[rows], points.counts[rows], points.bits[cols], points.counts[cols])
+        same = own[:, None] == labels[None, cols]
+        intra = same & (rows[:, None] != cols[None, :])
+        intra_sum += np.where(intra, sims, 0).sum(axis=1)
+        inter_sum += np.where(same, 0, sims).sum(axis=1)
+        np.minimum(intra_min, np.where(intra, sims, np.inf).min(axis=1), out=intra_min)
+        np.maximum(inter_max, np.where(same, -np.inf, sims).max(axis=1), out=inter_max)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (intra_sum / (sizes[own] - 1), np.where(np.isinf(intra_min), np.nan, intra_min),
+                inter_sum / (len(points) - sizes[own]), np.where(np.isinf(inter_max), np.nan, inter_max))
+
+def tanimoto_cluster_stats(X, labels:ArrayLike, sample_size:int=None, confidence:float=0.95, random_state=None,
+                           block_size:int=1024, n_jobs:int=1):
+    
+    """Intra- and inter-cluster Tanimoto similarities of each cluster, computed in blocks on the packed fingerprints.
+    
+    For each molecule, the mean and minimum similarity to the other members of its cluster and the mean and maximum
+    similarity to the molecules of the other clusters are computed against all the clustered molecules, then averaged
+    (or reduced) per cluster. Noise points are left out.
+    
+    With `sample_size`, only a random subset of molecules is compared with all the others, so the time is
+    O(sample_size * n) instead of O(n²). The means are then estimates, with normal confidence intervals from the
+    molecules sampled in each cluster (NaN for clusters with fewer than two sampled molecules), and the minimum and
+    maximum are only taken over the sampled molecules.
+    
+    Arguments:
+    
+        X : FingerprintMatrix or array
+            Fingerprints of the molecules.
+            
+        labels : array
+            Cluster labels, -1 for noise.
+            
+        sample_size : int, optional (default=None)
+            Number of molecules to sample. All the molecules are used if None.
+            
+        confidence : float, optional (default=0.95)
+            Confidence level of the intervals when sampling.
+            
+        random_state : int, optional (default=None)
+            Seed of the sampling.
+            
+        block_size : int, optional (default=1024)
+            Number of rows and columns of the similarity blocks.
+            
+        n_jobs : int, optional (default=1)
+            Number of processes.
+            
+    Returns:
+    
+        stats : pd.DataFrame
+            One row per cluster label, with the columns `size`, `intra_mean`, `intra_min`, `inter_mean` and `inter_max`,
+            and `n_sampled`, `intra_low`, `intra_high`, `inter_low` and `inter_high` when sampling.
+    
+    """
+    
+    import pandas as pd
+    
+    idx, codes, uniques = _clustered(labels)
+    points = _Points(X, 'tanimoto').take(idx)
+    points.labels = codes
+    rows = np.arange(len(idx))
+    if sample_size is not None and sample_size < len(idx):
+        rows = np.sort(np.random.default_rng(random_state).choice(len(idx), sample_size, replace=False))
+    tasks = [(rows[start:start+block_size], block_size) for start in range(0, len(rows), block_size)]
+    results = [np.column_stack(r) for r in _map_tasks(_tanimoto_stats_rows, points, tasks, n_jobs)]
+    per_row = pd.DataFrame(np.vstack(results) if results else np.zeros((0, 4)), columns=['intra_mean', 'intra_min', 'inter_mean', 'inter_max'])
+    per_row['label'] = uniques[codes[rows]]
+    groups = per_row.groupby('label')
+    stats = groups.agg(intra_mean=('intra_mean', 'mean'), intra_min=('intra_min', 'min'),
+                       inter_mean=('inter_mean', 'mean'), inter_max=('inter_max', 'max'))
+    stats.insert(0, 'size', pd.Series(np.bincount(codes), index=uniques))
+    stats = stats.reindex(pd.Index(uniques, name='label'))
+    if len(rows) < len(idx):
+        z = NormalDist().inv_cdf((1 + confidence) / 2)
+        stats.insert(1, 'n_sampled', groups.size().reindex(stats.index, fill_value=0))
+        for name in ('intra', 'inter'):
+            half = z * groups[f'{name}_mean'].std() / np.sqrt(groups[f'{name}_mean'].count())
+            stats[f'{name}_low'] = stats[f'{name}_mean'] - half
+            stats[f'{name}_high'] = stats[f'{name}_mean'] + half
+    return stats
+
+# %% ../../notebooks/validation.ipynb 25
+class Estimate(NamedTuple):
+    "Sampled estimate of a score, with the bounds of its confidence interval"
+    value: float
+    low: float
+    high: float
+
+def estimate_score(score_func:Callable, X, labels:ArrayLike, sample_size:int=10000, n_repeats:int=10, confidence:float=0.95,
+                   random_state=None, **kwargs):
+    
+    """Estimate a score from `n_repeats` random subsets of `sample_size` molecules, for datasets where the exact score takes
+    longer than the clustering.
+    
+    The estimate is the mean of the scores of the subsets, and the interval is the normal confidence interval of that
+    mean. For silhouette and Davies-Bouldin, the score of a random subset is close to the score of the whole dataset;
+    for DBCV it is biased, because the core distances depend on the density of the sample, so the estimate is mostly
+    useful to compare clusterings of the same dataset at the same sample size.
+    
+    Arguments:
+    
+        score_func : callable
+            `score_func(X, labels, **kwargs)`, e.g. `silhouette_score`, `davies_bouldin_score` or `dbcv_score`.
+            
+        X : FingerprintMatrix, array or str
+            Fingerprints or features of the molecules (or the path to a `.npy` file).
+            
+        labels : array
+            Cluster labels, -1 for noise.
+            
+        sample_size : int, optional (default=10000)
+            Number of molecules in each subset.
+            
+        n_repeats : int, optional (default=10)
+            Number of subsets.
+            
+        confidence : float, optional (default=0.95)
+            Confidence level of the interval.
+            
+        random_state : int, optional (default=None)
+            Seed of the sampling.
+            
+    Keyword arguments:
+    
+        Passed to `score_func`, e.g. `metric` or `n_jobs`.
+            
+    Returns:
+    
+        estimate : Estimate
+            Estimate, lower and upper bound.
+    
+    """
+    
+    labels = np.asarray(labels)
+    X = X if isinstance(X, FingerprintMatrix) else load_array(X)
+    rng = np.random.default_rng(random_state)
+    scores = []
+    for _ in range(n_repeats):
+        idx = np.sort(rng.choice(len(labels), min(sample_size, len(labels)), replace=False))
+        scores.append(score_func(X[idx], labels[idx], **kwargs))
+    value = float(np.mean(scores))
+    if n_repeats < 2:
+        return Estimate(value, np.nan, np.nan)
+    half = NormalDist().inv_cdf((1 + confidence) / 2) * float(np.std(scores, ddof=1)) / np.sqrt(n_repeats)
+    return Estimate(value, value - half, value + half)
@@ -1,7 +1,7 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../notebooks/viz.ipynb.
 
 # %% auto 0
-__all__ = ['ChemVisualiser']
+__all__ = ['ChemVisualiser', 'plot_dendrogram', 'plot_elbow']
 
 # %% ../notebooks/viz.ipynb 2
 import pandas as pd
@@ -12,7 +12,9 @@ import matplotlib.pyplot as plt
 
 import seaborn as sns
 
-# %% ../notebooks/viz.ipynb 3
+from .typing_basics import *
+
+# %% ../notebooks/viz.ipynb 4
 class ChemVisualiser:
     
     def __init__(self, data: pd.core.frame.DataFrame, id_col:str, smiles_col: str):
@@ -74,3 +76,93 @@ class ChemVisualiser:
 #         # run Dash app inline in notebook (or in an external server). The plotting height is set to 50 + height (recommended by developers)
 #         app.run_server(mode='inline', height=50+(height), width=width)
 
+
+# %% ../notebooks/viz.ipynb 5
+def _style_axes(ax):
+    sns.despine(ax=ax, right=True, top=True)
+    for spine in ax.spines.values():
+        spine.set_linewidth(1.5)
+        spine.set_color('k')
+
+def plot_dendrogram(linkage_matrix:ArrayLike, ylabel:str='Distance', figsize:tuple=(12,9), ax=None, **kwargs):
+    
+    """Plot a dendrogram from a linkage matrix, such as the one returned by `HierarchicalClustering.linkage_matrix`.
+    
+    The figure is returned and never shown, so it can be saved or displayed by the caller.
+    
+    Arguments:
+    
+        linkage_matrix : np.array
+            Linkage matrix with shape (n-1, 4), in the format of `scipy.cluster.hierarchy.linkage`
+            
+        ylabel : str (default='Distance')
+            Label of the distance axis
+            
+        figsize : tuple (default=(12,9))
+            Figure size, when `ax` is not given
+            
+        ax : matplotlib.axes.Axes, optional
+            Axes to draw on. By default a new figure is created.
+            
+    Keyword arguments:
+    
+        Passed to `scipy.cluster.hierarchy.dendrogram`, e.g. `truncate_mode='level', p=5`
+        
+    Returns:
+    
+        fig : matplotlib.figure.Figure
+    
+    """
+    
+    from scipy.cluster.hierarchy import dendrogram
+    
+    with sns.plotting_context('paper', font_scale=2.5), sns.axes_style('whitegrid'):
+        fig, ax = plt.subplots(figsize=figsize) if ax is None else (ax.figure, ax)
+        dendrogram(linkage_matrix, ax=ax, **kwargs)
+        ax.set_xlabel('Number of compounds in node (or index of point if no parenthesis).', fontsize=14)
+        ax.set_ylabel(ylabel, fontsize=14)
+        ax.set_title('Dendrogram', fontweight='bold', fontsize=20)
+        ax.tick_params(labelsize=12)
+        ax.grid(False)
+        _style_axes(ax)
+        fig.tight_layout()
+    return fig
+
+def plot_elbow(n_clusters:ArrayLike, inertias:ArrayLike, elbow_value:int=None, figsize:tuple=(12,9), ax=None):
+    
+    """Plot the inertia against the number of clusters, with a vertical line at `elbow_value` if it is given.
+    
+    The figure is returned and never shown, so it can be saved or displayed by the caller.
+    
+    Arguments:
+    
+        n_clusters, inertias : array
+            Numbers of clusters and inertias, e.g. the columns of `KMeansClustering.sweep_results`
+            
+        elbow_value : int, optional
+            Number of clusters at the elbow
+            
+        figsize : tuple (default=(12,9))
+            Figure size, when `ax` is not given
+            
+        ax : matplotlib.axes.Axes, optional
+            Axes to draw on. By default a new figure is created.
+            
+    Returns:
+    
+        fig : matplotlib.figure.Figure
+    
+    """
+    
+    with sns.plotting_context('paper', font_scale=2.0), sns.axes_style('whitegrid'):
+        fig, ax = plt.subplots(figsize=figsize) if ax is None else (ax.figure, ax)
+        sns.lineplot(x=np.asarray(n_clusters), y=np.asarray(inertias), ax=ax, linewidth=2.5, marker='o', color='blue', markersize=7)
+        ax.set_xlabel('Number of clusters (K)')
+        ax.set_ylabel('Distortion')
+        ax.set_title('K-means Elbow method', fontweight='bold', fontsize=22)
+        if elbow_value is not None:
+            ax.axvline(elbow_value, c='k', linestyle="--", label=f"Elbow at $K={elbow_value}$")
+            ax.legend(loc="best", fontsize=18, frameon=True)
+        _style_axes(ax)
+        fig.tight_layout()
+    return fig